@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# Snapshots retried within one write when the catalog changes while being serialised
+SNAPSHOT_ATTEMPTS = 5
+
+
+class CatalogStore:
+    """
+    Persists the dataset catalog and query history as one JSON file next to
+    the uploads, so a restarted server comes back with every dataset and its
+    columnar copy, metadata and statistics without re-uploading or re-parsing.
+    Changes only mark the catalog dirty; a background thread coalesces them
+    into at most one atomic write per `delay` seconds.
+    """
+
+    def __init__(self, path: Path, snapshot: Callable[[], Dict[str, Any]], delay: float = 1.0):
+        self.path = Path(path)
+        self._snapshot = snapshot
+        self._delay = delay
+        self._dirty = threading.Event()
+        # Serialises writes; only the writer thread and flush take it, never request handlers
+        self._lock = threading.Lock()
+        # Guards starting the writer thread, held only for that
+        self._writer_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self.saves = 0
+
+    def load(self) -> Dict[str, Any]:
+        """The persisted catalog, or an empty one when there is none or it is unreadable"""
+        if not self.path.exists():
+            return {"datasets": {}, "queries": []}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return {"datasets": state.get("datasets", {}), "queries": state.get("queries", [])}
+        except (OSError, ValueError) as e:
+            print(f"Could not read catalog {self.path}, starting empty: {e}")
+            return {"datasets": {}, "queries": []}
+
+    def mark_dirty(self):
+        """Schedule a write of the current catalog, without waiting for a write in progress"""
+        self._dirty.set()
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="catalog-writer", daemon=True)
+                self._writer.start()
+
+    def flush(self):
+        """Write the catalog now if there are unsaved changes"""
+        if self._dirty.is_set():
+            self._dirty.clear()
+            self._write()
+
+    def _write_loop(self):
+        while True:
+            self._dirty.wait()
+            # Let a burst of changes (upload, ingest, queries) land in one write
+            time.sleep(self._delay)
+            self.flush()
+
+    def _write(self):
+        with self._lock:
+            for _ in range(SNAPSHOT_ATTEMPTS):
+                try:
+                    data = json.dumps(self._snapshot(), default=str)
+                    break
+                except RuntimeError:
+                    # The catalog changed while being serialised, take a fresh snapshot
+                    continue
+            else:
+                self._dirty.set()
+                return
+            temp_path = self.path.with_name(f".{self.path.name}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+            self.saves += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "saves": self.saves,
+            "dirty": self._dirty.is_set()
+        }
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+
+def is_dictionary_encoded(series: pd.Series) -> bool:
+    """Whether a column is stored as a categorical (dictionary of values + integer codes)"""
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def equals_ignore_case_mask(series: pd.Series, value: str) -> np.ndarray:
+    """
+    Boolean mask of rows whose text equals value, ignoring case.
+    Dictionary-encoded columns compare only their distinct values and then
+    match rows on the integer codes.
+    """
+    if is_dictionary_encoded(series):
+        categories = series.cat.categories
+        matching_codes = np.flatnonzero(categories.astype(str).str.lower() == value.lower())
+        return np.isin(series.cat.codes.to_numpy(), matching_codes)
+    return (series.astype(str).str.lower() == value.lower()).to_numpy()
+
+
+def count_values(series: pd.Series) -> pd.Series:
+    """
+    Occurrences of each value, most frequent first.
+    Dictionary-encoded columns are counted on their codes; values that do not
+    occur in this (possibly filtered or chunked) frame are left out.
+    """
+    if is_dictionary_encoded(series):
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        present = counts > 0
+        result = pd.Series(counts[present], index=pd.Index(series.cat.categories[present]), name='count')
+        return result.sort_values(ascending=False, kind='stable')
+    return series.value_counts()
+
+
+def predicate_mask(series: pd.Series, op: str, value) -> np.ndarray:
+    """
+    Boolean mask of rows satisfying a filter predicate: '>', '<', '>=' and '<='
+    compare numbers, '=' matches text ignoring case and 'contains' searches the text.
+    """
+    if op == '>':
+        return (series > value).to_numpy()
+    if op == '<':
+        return (series < value).to_numpy()
+    if op == '>=':
+        return (series >= value).to_numpy()
+    if op == '<=':
+        return (series <= value).to_numpy()
+    if op == '=':
+        return equals_ignore_case_mask(series, value)
+    return series.astype(str).str.contains(value, case=False, na=False).to_numpy()
+
+
+def predicates_mask(df: pd.DataFrame, predicates) -> np.ndarray:
+    """Boolean mask of rows satisfying every predicate (column, op, value)"""
+    mask = predicate_mask(df[predicates[0].column], predicates[0].op, predicates[0].value)
+    for predicate in predicates[1:]:
+        mask = mask & predicate_mask(df[predicate.column], predicate.op, predicate.value)
+    return mask
@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+
+class DatasetCache:
+    """
+    Shared in-process cache of parsed datasets for Sankalp DBMS.
+    Entries are keyed by dataset id + file version and evicted least recently
+    used first once their deep memory usage exceeds the byte budget.
+    Each cached frame also carries a small dictionary of structures derived
+    from it (zone maps, indexes), dropped together with the frame.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._derived: Dict[int, Dict[Hashable, Any]] = {}
+        self._current_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_bytes: int):
+        """Change the byte budget, evicting entries if it shrank"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def fits(self, nbytes: int) -> bool:
+        """Whether a frame of this size can be held in the cache"""
+        return nbytes <= self.max_bytes
+
+    def contains(self, dataset_id: str, version: Hashable) -> bool:
+        """Whether this dataset version is cached, without touching counters or recency"""
+        with self._lock:
+            return (dataset_id, version) in self._entries
+
+    def get(self, dataset_id: str, version: Hashable) -> Optional[pd.DataFrame]:
+        """Return the cached frame for this dataset version, or None"""
+        key = (dataset_id, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, dataset_id: str, version: Hashable, df: pd.DataFrame):
+        """Store a frame, replacing any older version of the same dataset"""
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            self._drop(dataset_id)
+            if size > self.max_bytes:
+                return
+            self._entries[(dataset_id, version)] = (df, size)
+            self._derived[id(df)] = {}
+            self._current_bytes += size
+            self._evict()
+
+    def get_or_load(self, dataset_id: str, version: Hashable, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Return the cached frame or load, cache and return it"""
+        df = self.get(dataset_id, version)
+        if df is None:
+            df = loader()
+            self.put(dataset_id, version, df)
+        return df
+
+    def derived(self, df: pd.DataFrame) -> Optional[Dict[Hashable, Any]]:
+        """
+        Structures derived from a cached frame, keyed by the caller, or None if
+        df is not a frame held by the cache. Cached frames are never modified,
+        so anything stored here stays valid until the frame is dropped.
+        """
+        with self._lock:
+            return self._derived.get(id(df))
+
+    def invalidate(self, dataset_id: str):
+        """Drop every cached version of a dataset"""
+        with self._lock:
+            self._drop(dataset_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._derived.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
+
+    def _drop(self, dataset_id: str):
+        for key in [key for key in self._entries if key[0] == dataset_id]:
+            df, size = self._entries.pop(key)
+            self._derived.pop(id(df), None)
+            self._current_bytes -= size
+
+    def _evict(self):
+        while self._entries and self._current_bytes > self.max_bytes:
+            _, (df, size) = self._entries.popitem(last=False)
+            self._derived.pop(id(df), None)
+            self._current_bytes -= size
+            self.evictions += 1
+
+
+# Single cache shared by the query engine, visualization engine and server endpoints
+dataset_cache = DatasetCache(max_bytes=int(os.getenv("DATASET_CACHE_MB", "512")) * 1024 * 1024)
@@ -1,21 +1,909 @@
 import pandas as pd
+import numpy as np
+import gzip
+import io
 import json
+import os
+import re
+import zlib
 
-def load_dataframe(file_path, file_type):
+from dataset_cache import dataset_cache
+from shared_store import shared_store
+from column_ops import predicates_mask
+from query_parser import RANGE_OPS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pa_csv = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Row groups are the unit of statistics (min/max/null count) in the columnar copy
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+PARQUET_COMPRESSION = 'zstd'
+# Text that a missing value turns into when an object column is compared as strings
+MISSING_TEXT = ('nan', 'none', '<na>', 'nat')
+
+# Rough in-memory size of a parsed raw file relative to its size on disk
+RAW_MEMORY_EXPANSION = 2
+# Typical expansion of compressed text exports
+COMPRESSED_EXPANSION = 8
+
+# Compressed uploads keep their suffix on disk, e.g. <hash>.csv.gz
+COMPRESSION_SUFFIXES = {'gz': 'gzip', 'zst': 'zstd'}
+COMPRESSIBLE_FILE_TYPES = ('csv', 'json', 'jsonl', 'ndjson')
+CSV_TAIL_BLOCK_SIZE = 64 * 1024
+CSV_PROGRESS_CHUNK_ROWS = 100_000
+
+# CSVs at least this large are parsed by the multi-threaded Arrow reader
+PARALLEL_CSV_THRESHOLD_BYTES = int(os.getenv("PARALLEL_CSV_THRESHOLD_MB", "64")) * 1024 * 1024
+PARALLEL_CSV_BLOCK_SIZE = 16 * 1024 * 1024
+# pandas' default missing-value markers, so both CSV parsers agree on nulls
+CSV_NULL_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+# JSON arrays and JSON Lines are parsed into frames of this many records at a time
+JSON_FILE_TYPES = ('json', 'jsonl', 'ndjson')
+JSON_BATCH_ROWS = 50_000
+JSON_READ_SIZE = 1024 * 1024
+
+# Text values that are promoted to datetime columns at upload
+ISO_DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?$')
+DATE_SAMPLE_SIZE = 1000
+# Text columns with few distinct values are dictionary encoded as categoricals
+DICTIONARY_MAX_CARDINALITY = 10_000
+DICTIONARY_MAX_RATIO = 0.5
+STRING_DTYPE_NAMES = ('str', 'string', 'string[python]', 'string[pyarrow]', 'string[pyarrow_numpy]')
+
+def load_dataframe(file_path, file_type, schema=None, progress=None, sheet_name=None):
     """
     Load a dataframe from file based on file type.
     Handles file opening modes for each type.
+    A schema recorded at upload skips type inference and keeps dtypes stable.
+    progress(bytes_parsed, rows_seen) is called as a CSV is parsed.
+    sheet_name selects a workbook sheet, the first one by default.
+    CSV frames name the reader that parsed them in df.attrs["reader"].
     """
     if file_type == 'csv':
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return pd.read_csv(f)
-    elif file_type == 'json':
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            # Try to convert dict/list to DataFrame
-            return pd.DataFrame(data)
+        if uses_parallel_csv(file_path):
+            try:
+                df = _read_csv_parallel(file_path, schema, progress)
+                df.attrs["reader"] = "arrow"
+                return df
+            except pa.ArrowInvalid as e:
+                # Values the Arrow reader cannot convert, pandas is more lenient
+                print(f"Parallel CSV parse failed, falling back to pandas: {e}")
+        if progress is not None:
+            df = _read_csv_with_progress(file_path, schema, progress)
+        else:
+            with open_decompressed(file_path) as f:
+                df = pd.read_csv(f, encoding='utf-8', **csv_schema_options(schema))
+        df.attrs["reader"] = "pandas"
+        return df
+    elif file_type in JSON_FILE_TYPES:
+        return _read_json_streaming(file_path, file_type, schema, progress)
     elif file_type in ['xlsx', 'xls']:
         with open(file_path, 'rb') as f:
-            return pd.read_excel(f)
+            return apply_schema(pd.read_excel(f, sheet_name=sheet_name if sheet_name is not None else 0), schema)
     else:
         raise ValueError("Unsupported file type: " + file_type)
+
+def split_compression(filename):
+    """
+    (file type, compression) of an uploaded file name: 'sales.csv.gz' gives
+    ('csv', 'gzip'), 'sales.csv' gives ('csv', None).
+    """
+    parts = filename.lower().split('.')
+    compression = COMPRESSION_SUFFIXES.get(parts[-1]) if len(parts) > 2 else None
+    if compression:
+        return parts[-2], compression
+    return parts[-1], None
+
+def compression_available(compression):
+    return compression == 'gzip' or (compression == 'zstd' and zstandard is not None)
+
+def file_compression(file_path):
+    """Compression of a stored file, from its suffix"""
+    return COMPRESSION_SUFFIXES.get(str(file_path).rsplit('.', 1)[-1])
+
+class StreamDecompressor:
+    """
+    Incremental decompression of an upload as its blocks arrive, across
+    concatenated gzip members or zstd frames.
+    """
+
+    def __init__(self, compression):
+        self.compression = compression
+        self._decompressor = self._new()
+
+    def _new(self):
+        if self.compression == 'gzip':
+            return zlib.decompressobj(zlib.MAX_WBITS | 16)
+        return zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data):
+        output = []
+        while data:
+            output.append(self._decompressor.decompress(data))
+            if not self._decompressor.eof:
+                break
+            data = self._decompressor.unused_data
+            if data:
+                self._decompressor = self._new()
+        return b''.join(output)
+
+def open_decompressed(file_path):
+    """
+    Binary reader over a stored file that decompresses as it is read.
+    position() is the offset in the file on disk, for progress reporting.
+    """
+    return DecompressedFile(file_path)
+
+class DecompressedFile:
+    """File object returned by open_decompressed"""
+
+    mode = 'rb'
+
+    def __init__(self, file_path):
+        self._raw = open(file_path, 'rb')
+        compression = file_compression(file_path)
+        if compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='rb')
+        elif compression == 'zstd':
+            self._stream = zstandard.ZstdDecompressor().stream_reader(self._raw, read_across_frames=True)
+        else:
+            self._stream = self._raw
+
+    def position(self):
+        return self._raw.tell()
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __iter__(self):
+        return iter(self._stream)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+
+def excel_sheet_names(file_path, file_type):
+    """
+    Sheet names of a workbook, in workbook order, without parsing any cells.
+    """
+    if file_type == 'xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    with pd.ExcelFile(file_path) as workbook:
+        return [str(name) for name in workbook.sheet_names]
+
+def iter_excel_sheets(file_path, file_type):
+    """
+    Yield (sheet name, DataFrame) for every sheet of a workbook, one sheet at
+    a time. .xlsx sheets are streamed row by row in openpyxl's read-only mode;
+    legacy .xls is parsed through pandas.
+    """
+    if file_type != 'xlsx':
+        with pd.ExcelFile(file_path) as workbook:
+            for name in workbook.sheet_names:
+                yield str(name), workbook.parse(name)
+        return
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            yield worksheet.title, _sheet_frame(worksheet.iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+def _sheet_frame(rows):
+    """DataFrame from worksheet row tuples, first row as header like pd.read_excel"""
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    records = [row for row in rows]
+    # Read-only worksheets may report formatted but empty trailing rows
+    while records and all(value is None for value in records[-1]):
+        records.pop()
+    columns, seen = [], {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    width = len(columns)
+    records = [tuple(row[:width]) + (None,) * (width - len(row)) for row in records]
+    return pd.DataFrame(records, columns=columns).infer_objects()
+
+def compact_string_dtype():
+    """
+    Arrow-backed string dtype with NaN for missing values, or object without pyarrow.
+    """
+    if pa is None:
+        return 'object'
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        # pandas < 2.3 spells the NaN-semantics variant differently
+        return 'string[pyarrow_numpy]'
+
+def infer_schema(df):
+    """
+    Choose compact dtypes for a freshly parsed frame.
+    Integers are downcast to the smallest type holding their range, ISO
+    formatted text becomes datetimes, low-cardinality text is dictionary
+    encoded as a categorical and other text becomes Arrow strings.
+    Returns {column: dtype name}, suitable for metadata["column_types"].
+    """
+    schema = {}
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if pd.api.types.is_integer_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype):
+            dtype = pd.to_numeric(series, downcast='integer').dtype if len(series) else dtype
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            values = series.dropna()
+            if len(values) and values.map(type).eq(str).all():
+                # Check a sample first so ordinary text skips the full-column match
+                sample = values.head(DATE_SAMPLE_SIZE)
+                distinct = values.nunique()
+                if sample.str.match(ISO_DATE_PATTERN).all() and values.str.match(ISO_DATE_PATTERN).all():
+                    dtype = 'datetime64[ns]'
+                elif distinct <= DICTIONARY_MAX_CARDINALITY and distinct <= len(series) * DICTIONARY_MAX_RATIO:
+                    dtype = 'category'
+                else:
+                    dtype = compact_string_dtype()
+        schema[str(col)] = str(dtype)
+    return schema
+
+def resolve_dtype(dtype_name):
+    """
+    Map a dtype name stored in the catalog back to a pandas dtype.
+    """
+    if dtype_name in STRING_DTYPE_NAMES:
+        return compact_string_dtype()
+    return dtype_name
+
+def apply_schema(df, schema):
+    """
+    Cast a frame to the schema recorded at upload.
+    """
+    if not schema:
+        return df
+    casts = {}
+    for col in df.columns:
+        dtype_name = schema.get(str(col))
+        if dtype_name is None or str(df[col].dtype) == dtype_name:
+            continue
+        if dtype_name.startswith('datetime64'):
+            casts[col] = pd.to_datetime(df[col], format='ISO8601')
+        else:
+            casts[col] = df[col].astype(resolve_dtype(dtype_name))
+    return df.assign(**casts) if casts else df
+
+def csv_schema_options(schema, usecols=None):
+    """
+    dtype= and parse_dates= arguments for pd.read_csv from an upload schema.
+    """
+    if not schema:
+        return {"usecols": usecols} if usecols is not None else {}
+    wanted = set(usecols) if usecols is not None else None
+    dtype, parse_dates = {}, []
+    for col, dtype_name in schema.items():
+        if wanted is not None and col not in wanted:
+            continue
+        if dtype_name.startswith('datetime64'):
+            parse_dates.append(col)
+        else:
+            dtype[col] = resolve_dtype(dtype_name)
+    options = {"dtype": dtype, "parse_dates": parse_dates}
+    if parse_dates:
+        options["date_format"] = 'ISO8601'
+    if usecols is not None:
+        options["usecols"] = usecols
+    return options
+
+def dataset_schema(dataset):
+    """
+    The binding schema recorded for a catalog dataset, if any.
+    """
+    return dataset.get("metadata", {}).get("column_types") or None
+
+def write_columnar(df, columnar_path):
+    """
+    Write the canonical columnar (Parquet) copy of a dataset.
+    Returns the columnar schema as {column: arrow type}, or None when pyarrow
+    is not installed and only the raw file can be used.
+    """
+    if pq is None:
+        return None
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(
+        table,
+        columnar_path,
+        compression=PARQUET_COMPRESSION,
+        row_group_size=PARQUET_ROW_GROUP_SIZE,
+        write_statistics=True
+    )
+    return {field.name: str(field.type) for field in table.schema}
+
+def load_columnar(columnar_path, dataset_id=None, version=None):
+    """
+    Load a dataframe from its columnar copy.
+    When the shared-memory store is enabled the copy is published there once
+    and every worker process attaches to the same memory-mapped table.
+    """
+    if dataset_id is not None and shared_store.enabled:
+        df = shared_store.attach(dataset_id, version)
+        if df is None:
+            shared_store.publish(dataset_id, version, pq.read_table(columnar_path))
+            df = shared_store.attach(dataset_id, version)
+        if df is not None:
+            return df
+    return pd.read_parquet(columnar_path)
+
+def file_version(file_path):
+    """
+    Version token for a stored file, changes whenever the file is rewritten.
+    """
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def columnar_source(dataset):
+    """
+    Path of the dataset's columnar copy, or None when reads must use the raw file.
+    """
+    columnar_path = dataset.get("columnar_path")
+    if columnar_path and pq is not None and os.path.exists(columnar_path):
+        return columnar_path
+    return None
+
+def content_key(dataset):
+    """
+    Cache/storage key of a dataset's content. Catalog entries created from
+    identical uploads share one key, and with it cached frames and indexes.
+    """
+    if not dataset.get("content_hash"):
+        return dataset["id"]
+    key = f"{dataset['content_hash']}.{dataset['file_type']}"
+    if dataset.get("sheet_index") is not None:
+        # Every sheet of a workbook is its own table
+        key += f".sheet{dataset['sheet_index']}"
+    return key
+
+def dataset_version(dataset):
+    """
+    Version token of the file a dataset is read from.
+    """
+    return file_version(columnar_source(dataset) or dataset["file_path"])
+
+def estimate_memory_bytes(dataset):
+    """
+    Estimate the in-memory size of a fully loaded dataset without loading it.
+    Uses the uncompressed size recorded in the Parquet footer when available.
+    """
+    columnar_path = columnar_source(dataset)
+    if columnar_path:
+        metadata = pq.ParquetFile(columnar_path).metadata
+        return sum(metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups))
+    size = os.path.getsize(dataset["file_path"]) * RAW_MEMORY_EXPANSION
+    return size * COMPRESSED_EXPANSION if file_compression(dataset["file_path"]) else size
+
+def load_dataset(dataset, columns=None, nrows=None, tail=None, predicates=None):
+    """
+    Load a catalog dataset through the shared DataFrame cache.
+    Reads the columnar copy when one was written at upload, else the raw file.
+    columns/nrows/tail push a projection or row limit into the reader, and
+    filter predicates let it skip row groups that cannot match; they are
+    served from the cached frame when the dataset is (or fits) in the cache, and
+    read straight from disk otherwise. Rows not matching the predicates may
+    still be returned, callers apply the filter themselves.
+    The returned frame is shared between callers and must not be modified in place.
+    """
+    version = dataset_version(dataset)
+    if columns is None and nrows is None and tail is None and not predicates:
+        return dataset_cache.get_or_load(content_key(dataset), version, lambda: _read_full(dataset, version))
+
+    df = _cached_frame(dataset, version)
+    if df is not None:
+        return _slice_frame(df, columns, nrows, tail)
+    columnar_path = columnar_source(dataset)
+    if predicates and columnar_path:
+        row_groups = matching_row_groups(columnar_path, predicates)
+        if row_groups is not None:
+            table = pq.ParquetFile(columnar_path).read_row_groups(row_groups, columns=columns)
+            return _slice_frame(table.to_pandas(), nrows=nrows, tail=tail)
+    return _read_partial(dataset, columns, nrows, tail)
+
+def take_rows(dataset, positions):
+    """
+    Rows of a dataset at ascending row positions, labelled with those positions.
+    Served from the cached frame when the dataset is (or fits) in the cache;
+    otherwise only the row groups of the columnar copy holding the rows are read.
+    """
+    version = dataset_version(dataset)
+    df = _cached_frame(dataset, version)
+    columnar_path = columnar_source(dataset)
+    if df is not None or columnar_path is None:
+        return (df if df is not None else _load_raw(dataset)).iloc[positions]
+
+    parquet_file = pq.ParquetFile(columnar_path)
+    metadata = parquet_file.metadata
+    offsets = np.cumsum([0] + [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)])
+    groups = np.searchsorted(offsets, positions, side='right') - 1
+    needed = np.unique(groups)
+    table = parquet_file.read_row_groups(needed.tolist())
+    # Offset of each needed row group within the table the groups are read into
+    table_offsets = np.cumsum(np.concatenate(([0], offsets[needed + 1] - offsets[needed])))[:-1]
+    local = positions - offsets[groups] + table_offsets[np.searchsorted(needed, groups)]
+    df = table.take(pa.array(local, type=pa.int64())).to_pandas()
+    df.index = pd.Index(positions)
+    return df
+
+def is_cached(dataset):
+    """
+    Whether the full dataset is currently held in the shared cache.
+    """
+    return dataset_cache.contains(content_key(dataset), dataset_version(dataset))
+
+def load_dataset_columns(dataset):
+    """
+    Column names of a dataset, read from the file header/schema only.
+    """
+    return [str(col) for col in _read_partial(dataset, nrows=0).columns]
+
+def iter_dataset_chunks(dataset, columns=None, chunk_rows=100_000, predicates=None):
+    """
+    Yield a dataset as DataFrames of at most chunk_rows rows, holding only
+    the projected columns, without ever materialising the whole file.
+    With filter predicates, row groups of the columnar copy that cannot
+    match are skipped; the remaining chunks still need filtering.
+    """
+    columnar_path = columnar_source(dataset)
+    if columnar_path:
+        parquet_file = pq.ParquetFile(columnar_path)
+        row_groups = matching_row_groups(columnar_path, predicates) if predicates else None
+        if row_groups is None:
+            row_groups = range(parquet_file.metadata.num_row_groups)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, row_groups=row_groups, columns=columns):
+            yield batch.to_pandas()
+    elif dataset["file_type"] == 'csv':
+        options = csv_schema_options(dataset_schema(dataset), usecols=columns)
+        with pd.read_csv(dataset["file_path"], chunksize=chunk_rows, **options) as reader:
+            for chunk in reader:
+                yield chunk
+    else:
+        # JSON and Excel cannot be read incrementally
+        yield _slice_frame(_load_raw(dataset), columns)
+
+def matching_row_groups(columnar_path, predicates):
+    """
+    Indexes of the row groups of a columnar copy that can hold rows matching
+    every filter predicate (column, op, value), or None when the predicates
+    cannot be pushed into the file and every row group must be read.
+    Row groups are first ruled out by their min/max statistics; the rest are
+    probed by reading only the predicate columns before any other column of
+    the row group is touched. Dictionary-encoded (categorical) columns come
+    back as dictionaries, so equality is decided on their distinct values.
+    """
+    parquet_file = pq.ParquetFile(columnar_path)
+    schema = parquet_file.schema_arrow
+    metadata = parquet_file.metadata
+    if metadata.num_row_groups == 0:
+        return [] if all(predicate.column in schema.names for predicate in predicates) else None
+    first_group = metadata.row_group(0)
+
+    checks = []
+    for predicate in predicates:
+        if predicate.column not in schema.names:
+            return None
+        arrow_type = schema.field(predicate.column).type
+        if pa.types.is_dictionary(arrow_type):
+            arrow_type = arrow_type.value_type
+        numeric = pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type)
+        text = pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+        if predicate.op in RANGE_OPS and not numeric:
+            # Comparing other types raises, leave that to the caller's own filter
+            return None
+        column_index = next(
+            (j for j in range(first_group.num_columns) if first_group.column(j).path_in_schema == predicate.column), None
+        )
+        if column_index is None:
+            return None
+        checks.append((predicate, column_index, numeric, text))
+
+    candidates = [
+        i for i in range(metadata.num_row_groups)
+        if all(_statistics_allow(metadata.row_group(i).column(column_index).statistics, predicate, numeric, text)
+               for predicate, column_index, numeric, text in checks)
+    ]
+    return [i for i in candidates if _row_group_matches(parquet_file, i, predicates)]
+
+def _statistics_allow(statistics, predicate, numeric, text):
+    """Whether a row group's min/max/null count leave room for a matching row"""
+    if statistics is None or not statistics.has_min_max:
+        return True
+    minimum, maximum = statistics.min, statistics.max
+    value = predicate.value
+    if predicate.op == '>':
+        return maximum > value
+    if predicate.op == '<':
+        return minimum < value
+    if predicate.op == '>=':
+        return maximum >= value
+    if predicate.op == '<=':
+        return minimum <= value
+    if predicate.op != '=':
+        return True
+
+    needle = str(value).lower()
+    if needle in MISSING_TEXT and statistics.null_count:
+        return True
+    if numeric:
+        # Numbers match when their text equals the value, which then parses as a number in range
+        try:
+            number = float(value)
+        except ValueError:
+            return False
+        return not np.isfinite(number) or minimum <= number <= maximum
+    if text and needle.isascii():
+        # Case variants of an ASCII value sort between its upper and lower case spelling,
+        # except through the Kelvin sign, the one non-ASCII character that lower-cases to 'k'
+        if maximum < needle.upper():
+            return False
+        return 'k' in needle or minimum <= needle
+    return True
+
+def _row_group_matches(parquet_file, index, predicates):
+    """Evaluate the predicates on one row group's predicate columns"""
+    try:
+        columns = list(dict.fromkeys(predicate.column for predicate in predicates))
+        frame = parquet_file.read_row_group(index, columns=columns).to_pandas()
+        return bool(predicates_mask(frame, predicates).any())
+    except Exception:
+        # Let the caller's filter report anything the predicate cannot evaluate
+        return True
+
+def _read_full(dataset, version):
+    columnar_path = columnar_source(dataset)
+    if columnar_path:
+        return load_columnar(columnar_path, content_key(dataset), version)
+    return _load_raw(dataset)
+
+def _load_raw(dataset):
+    """Parse a dataset from its uploaded file, used only when there is no columnar copy"""
+    return load_dataframe(dataset["file_path"], dataset["file_type"], dataset_schema(dataset),
+                          sheet_name=dataset.get("sheet_name"))
+
+def _cached_frame(dataset, version):
+    """The cached full frame of a dataset, loading it into the cache when it fits, else None"""
+    df = dataset_cache.get(content_key(dataset), version)
+    if df is None and dataset_cache.fits(estimate_memory_bytes(dataset)):
+        df = _read_full(dataset, version)
+        dataset_cache.put(content_key(dataset), version, df)
+    return df
+
+def _slice_frame(df, columns=None, nrows=None, tail=None):
+    if columns is not None:
+        df = df[columns]
+    if nrows is not None:
+        df = df.head(nrows)
+    if tail is not None:
+        df = df.tail(tail)
+    return df
+
+def _read_partial(dataset, columns=None, nrows=None, tail=None):
+    """
+    Read only the requested columns/rows from disk.
+    """
+    columnar_path = columnar_source(dataset)
+    if columnar_path:
+        return _read_columnar_partial(columnar_path, columns, nrows, tail)
+
+    file_path = dataset["file_path"]
+    schema = dataset_schema(dataset)
+    if dataset["file_type"] == 'csv':
+        if tail is not None and not file_compression(file_path):
+            return _slice_frame(_read_csv_tail(file_path, tail, usecols=columns, schema=schema), nrows=nrows)
+        if tail is not None:
+            # A compressed file cannot be read backwards
+            return _slice_frame(pd.read_csv(file_path, **csv_schema_options(schema, usecols=columns)), nrows=nrows, tail=tail)
+        return pd.read_csv(file_path, nrows=nrows, **csv_schema_options(schema, usecols=columns))
+
+    # JSON and Excel cannot be read partially
+    return _slice_frame(_load_raw(dataset), columns, nrows, tail)
+
+def _read_columnar_partial(columnar_path, columns=None, nrows=None, tail=None):
+    """
+    Read a projection of the columnar copy, touching only the row groups that
+    cover the first nrows or last tail rows.
+    """
+    parquet_file = pq.ParquetFile(columnar_path)
+    if nrows == 0:
+        return parquet_file.schema_arrow.empty_table().to_pandas()[columns or slice(None)]
+
+    metadata = parquet_file.metadata
+    row_groups = list(range(metadata.num_row_groups))
+    wanted = tail if tail is not None else nrows
+    if wanted is not None:
+        if tail is not None:
+            row_groups.reverse()
+        selected, rows = [], 0
+        for i in row_groups:
+            if rows >= wanted:
+                break
+            selected.append(i)
+            rows += metadata.row_group(i).num_rows
+        row_groups = sorted(selected)
+
+    table = parquet_file.read_row_groups(row_groups, columns=columns)
+    return _slice_frame(table.to_pandas(), nrows=nrows, tail=tail)
+
+def _read_csv_with_progress(file_path, schema, progress, chunk_rows=CSV_PROGRESS_CHUNK_ROWS):
+    """
+    Parse a whole CSV in chunks, reporting bytes and rows parsed after each one.
+    """
+    chunks, rows = [], 0
+    with open_decompressed(file_path) as f:
+        with pd.read_csv(f, encoding='utf-8', chunksize=chunk_rows, **csv_schema_options(schema)) as reader:
+            for chunk in reader:
+                chunks.append(chunk)
+                rows += len(chunk)
+                progress(f.position(), rows)
+    if not chunks:
+        # Header-only file
+        return pd.read_csv(file_path, **csv_schema_options(schema))
+    # Per-chunk categoricals have their own dictionaries, re-apply the schema after joining
+    return apply_schema(pd.concat(chunks, ignore_index=True), schema)
+
+def uses_parallel_csv(file_path):
+    """Whether load_dataframe parses this CSV with the multi-threaded Arrow reader"""
+    size = os.path.getsize(file_path)
+    if file_compression(file_path):
+        size *= COMPRESSED_EXPANSION
+    return pa_csv is not None and size >= PARALLEL_CSV_THRESHOLD_BYTES
+
+def _arrow_csv_types(schema):
+    """Arrow column types for the CSV reader from an upload schema"""
+    types = {}
+    for col, dtype_name in (schema or {}).items():
+        if dtype_name.startswith('datetime64'):
+            types[col] = pa.timestamp('ns')
+        elif dtype_name == 'bool':
+            types[col] = pa.bool_()
+        elif dtype_name.startswith(('int', 'uint', 'float')):
+            types[col] = pa.from_numpy_dtype(np.dtype(dtype_name))
+        else:
+            # Text, categoricals and mixed columns are cast by apply_schema afterwards
+            types[col] = pa.string()
+    return types
+
+def _read_csv_parallel(file_path, schema=None, progress=None):
+    """
+    Parse a whole CSV with Arrow's reader, which splits the file into blocks
+    and converts them on all cores. progress(bytes_read, 0) follows the reads
+    and the row count is reported once the table is complete.
+    """
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=PARALLEL_CSV_BLOCK_SIZE)
+    convert_options = pa_csv.ConvertOptions(
+        column_types=_arrow_csv_types(schema), null_values=CSV_NULL_VALUES, strings_can_be_null=True
+    )
+    with open_decompressed(file_path) as f:
+        source = _ProgressReader(f, progress) if progress is not None else f
+        table = pa_csv.read_csv(source, read_options=read_options, convert_options=convert_options)
+    if progress is not None:
+        progress(os.path.getsize(file_path), table.num_rows)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    return apply_schema(df, schema)
+
+class _ProgressReader:
+    """File wrapper reporting the bytes handed to the Arrow reader"""
+
+    def __init__(self, f, progress):
+        self._f = f
+        self._progress = progress
+        self.closed = False
+
+    def read(self, size=-1):
+        data = self._f.read(size)
+        self._progress(self._f.position(), 0)
+        return data
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def close(self):
+        self.closed = True
+
+def _read_json_streaming(file_path, file_type, schema=None, progress=None, batch_rows=JSON_BATCH_ROWS):
+    """
+    Parse a JSON array of records or a JSON Lines file without materialising
+    the whole document. Records are decoded one at a time and every batch is
+    turned into a frame, with nested objects flattened into dotted columns,
+    so the Python objects alive at once are bounded by the batch size.
+    A JSON object of columns is still loaded whole.
+    """
+    layout = _json_layout(file_path, file_type)
+    frames, rows = [], 0
+    raw = open_decompressed(file_path)
+    with io.TextIOWrapper(raw, encoding='utf-8') as f:
+        if layout == 'document':
+            return apply_schema(pd.DataFrame(json.load(f)), schema)
+        records = _iter_json_array(f) if layout == 'array' else _iter_json_lines(f)
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_rows:
+                frames.append(_json_batch_frame(batch))
+                rows += len(batch)
+                batch = []
+                if progress is not None:
+                    progress(raw.position(), rows)
+        if batch or not frames:
+            frames.append(_json_batch_frame(batch))
+            rows += len(batch)
+        if progress is not None:
+            progress(os.path.getsize(file_path), rows)
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    return apply_schema(df, schema)
+
+def _json_batch_frame(records):
+    """Frame of one batch of records, nested objects flattened as parent.child columns"""
+    df = pd.DataFrame(records)
+    parts, flattened = [], False
+    for col in df.columns:
+        values = df[col]
+        is_object = values.dtype == object
+        nested = values.map(lambda value: isinstance(value, dict)).to_numpy(dtype=bool) if is_object else None
+        if nested is None or not nested.any():
+            parts.append(values)
+            continue
+        # Scalars mixed with objects stay in the parent column
+        scalars = values.where(~nested)
+        if scalars.notna().any():
+            parts.append(scalars)
+        children = _json_batch_frame([value if is_nested else {} for value, is_nested in zip(values, nested)])
+        parts.append(children.add_prefix(f"{col}."))
+        flattened = True
+    return pd.concat(parts, axis=1) if flattened else df
+
+def _json_layout(file_path, file_type):
+    """
+    'array' for a top-level array of records, 'lines' for JSON Lines, or
+    'document' when the file has to be loaded whole. Reads only the start of the file.
+    """
+    with io.TextIOWrapper(open_decompressed(file_path), encoding='utf-8') as f:
+        head = ''
+        while not head.strip():
+            chunk = f.read(4096)
+            if not chunk:
+                break
+            head += chunk
+        first = head.lstrip()[:1]
+        if first == '[' and file_type == 'json':
+            return 'array'
+        if first == '{' and (file_type != 'json' or _starts_as_json_lines(head, f)):
+            return 'lines'
+    if file_type != 'json' and first:
+        raise ValueError("JSON Lines files must hold one JSON object per line")
+    return 'document'
+
+def _starts_as_json_lines(head, f):
+    """
+    Whether a .json file is JSON Lines: its first line is a complete object
+    and another line follows. A single-line object is a document of columns.
+    """
+    pending, lines = head, []
+    while len(lines) < 2:
+        newline = pending.find('\n')
+        if newline < 0:
+            more = f.readline()
+            if not more:
+                if pending.strip():
+                    lines.append(pending)
+                break
+            pending += more
+            continue
+        line, pending = pending[:newline], pending[newline + 1:]
+        if line.strip():
+            lines.append(line)
+    if len(lines) < 2:
+        return False
+    try:
+        return isinstance(json.loads(lines[0]), dict)
+    except ValueError:
+        return False
+
+def _iter_json_lines(f):
+    for line_number, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+
+def _iter_json_array(f, read_size=JSON_READ_SIZE):
+    """Decode the elements of a top-level JSON array one by one from a text stream"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(read_size).lstrip()[1:]
+    position, eof = 0, False
+    while True:
+        position = _skip_json_separators(buffer, position)
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+            # A value running to the end of the buffer (e.g. a number) may continue in the next read
+            if end < len(buffer) or eof:
+                yield record
+                position = end
+                continue
+        except ValueError:
+            if eof:
+                raise ValueError("Truncated or invalid JSON array")
+        chunk = f.read(read_size)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+        if eof and not buffer.strip():
+            raise ValueError("Truncated JSON array")
+
+def _skip_json_separators(buffer, position):
+    while position < len(buffer) and buffer[position] in ' \t\r\n,':
+        position += 1
+    return position
+
+def _read_csv_tail(file_path, n, usecols=None, schema=None):
+    """
+    Parse only the last n rows of a CSV by scanning backwards from the end of
+    the file for line breaks. Assumes records do not contain quoted newlines.
+    """
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        block = b''
+        # n rows need n line breaks plus the one ending the previous row
+        while position > data_start and block.count(b'\n') <= n:
+            read_size = min(CSV_TAIL_BLOCK_SIZE, position - data_start)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + block
+        if position > data_start:
+            block = block[block.index(b'\n') + 1:]
+    lines = block.rstrip(b'\r\n').split(b'\n')[-n:] if n > 0 else []
+    body = header + b'\n'.join(lines)
+    return pd.read_csv(io.BytesIO(body), **csv_schema_options(schema, usecols=usecols))
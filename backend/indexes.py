@@ -0,0 +1,689 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from column_ops import is_dictionary_encoded, predicates_mask
+from dataset_cache import dataset_cache
+from file_utils import load_dataset, content_key, dataset_version
+from query_parser import Predicate
+
+# Rows summarised by one zone map entry
+ZONE_MAP_BLOCK_ROWS = 8192
+# Above this share of blocks needing a row-by-row compare, one vectorised mask is faster
+ZONE_MAP_MAX_SCAN_FRACTION = 0.5
+# Integer ticks of NaT in a datetime column
+NAT_TICKS = np.iinfo(np.int64).min
+
+COMPARISONS = {'>': np.greater, '<': np.less, '>=': np.greater_equal, '<=': np.less_equal}
+# Bitmap indexes split rows into chunks of 2**16; a value with more rows than this in a chunk gets a dense bitmap
+BITMAP_CHUNK_BITS = 16
+BITMAP_ARRAY_MAX_ROWS = 4096
+BITMAP_CHUNK_WORDS = (1 << BITMAP_CHUNK_BITS) // 64
+# contains filters are regular expressions; patterns using these characters are not looked up in a trigram index
+REGEX_METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+
+class ZoneMap:
+    """
+    Per-block min/max summary of a numeric or datetime column of a cached frame.
+    A range filter compares rows only in blocks whose range straddles the
+    bound; blocks entirely inside it are taken whole and blocks entirely
+    outside it are skipped. Missing values never match a range filter.
+    """
+
+    def __init__(self, series: pd.Series, block_rows: int = ZONE_MAP_BLOCK_ROWS):
+        self.block_rows = block_rows
+        self.unit = series.dt.unit if self.is_datetime(series) else None
+        self.tz = series.dt.tz if self.unit else None
+        if self.unit:
+            # Datetimes are summarised on their integer ticks, NaT (NAT_TICKS) being the smallest integer
+            self.values = series.array.asi8
+            missing = series.isna().to_numpy()
+            low = np.where(missing, np.iinfo(np.int64).max, self.values)
+            high = self.values
+        else:
+            self.values = series.to_numpy()
+            missing = np.isnan(self.values) if self.values.dtype.kind == 'f' else None
+            low = high = self.values
+        self.length = len(self.values)
+        self.starts = np.arange(0, self.length, block_rows)
+        if self.length:
+            # fmin/fmax ignore NaN, so a block that is all NaN has NaN bounds and never matches
+            self.mins = np.fmin.reduceat(low, self.starts)
+            self.maxs = np.fmax.reduceat(high, self.starts)
+            self.has_missing = (np.logical_or.reduceat(missing, self.starts)
+                                if missing is not None else np.zeros(len(self.starts), dtype=bool))
+        else:
+            self.mins = self.maxs = low[:0]
+            self.has_missing = np.zeros(0, dtype=bool)
+
+    @staticmethod
+    def is_datetime(series: pd.Series) -> bool:
+        return isinstance(series.dtype, pd.DatetimeTZDtype) or series.dtype.kind == 'M'
+
+    @classmethod
+    def supports(cls, series: pd.Series) -> bool:
+        """Numeric and datetime columns can be summarised"""
+        return cls.is_datetime(series) or _is_numeric(series)
+
+    def bound(self, value: Any) -> Optional[Any]:
+        """
+        The filter value in the column's representation, or None when the column
+        would not compare with it the way pandas does (callers then fall back to
+        a plain mask, which also reports the comparison error).
+        """
+        if self.unit is None:
+            return value if _is_number(value) else None
+        if not isinstance(value, (str, date, datetime, np.datetime64)):
+            return None
+        try:
+            timestamp = pd.Timestamp(value)
+            if (timestamp.tz is None) != (self.tz is None):
+                return None
+            return int(timestamp.as_unit(self.unit, round_ok=False).asm8.view('i8'))
+        except (ValueError, TypeError, OverflowError):
+            return None
+
+    def matching_rows(self, predicates: Sequence[Predicate]) -> Optional[Union[slice, np.ndarray]]:
+        """
+        Positions of the rows satisfying every range predicate on this column,
+        in row order, or None if a value cannot be used with this zone map or
+        too many blocks straddle the range (unclustered columns) for skipping
+        to pay. Matches forming one contiguous run of rows come back as a slice.
+        """
+        candidates = np.ones(len(self.starts), dtype=bool)
+        inside = ~self.has_missing
+        bounds = []
+        for predicate in predicates:
+            bound = self.bound(predicate.value)
+            if bound is None or predicate.op not in COMPARISONS:
+                return None
+            compare = COMPARISONS[predicate.op]
+            # A block can match if its most favourable value does, and matches whole if its least favourable does
+            best, worst = (self.maxs, self.mins) if predicate.op in ('>', '>=') else (self.mins, self.maxs)
+            candidates &= compare(best, bound)
+            inside &= compare(worst, bound)
+            bounds.append((compare, bound))
+        inside &= candidates
+        if np.count_nonzero(candidates & ~inside) > ZONE_MAP_MAX_SCAN_FRACTION * len(self.starts):
+            return None
+
+        # Consecutive blocks inside the range are merged into one run of rows
+        runs: List[Union[range, np.ndarray]] = []
+        for block in np.flatnonzero(candidates):
+            start = int(self.starts[block])
+            end = min(start + self.block_rows, self.length)
+            if inside[block]:
+                if runs and isinstance(runs[-1], range) and runs[-1].stop == start:
+                    runs[-1] = range(runs[-1].start, end)
+                else:
+                    runs.append(range(start, end))
+                continue
+            values = self.values[start:end]
+            matches = values != NAT_TICKS if self.unit else np.ones(len(values), dtype=bool)
+            for compare, bound in bounds:
+                matches &= compare(values, bound)
+            runs.append(start + np.flatnonzero(matches))
+        if not runs:
+            return slice(0, 0)
+        if len(runs) == 1 and isinstance(runs[0], range):
+            return slice(runs[0].start, runs[0].stop)
+        return np.concatenate([np.arange(run.start, run.stop) if isinstance(run, range) else run for run in runs])
+
+
+class SortedIndex:
+    """
+    Sorted permutation of a numeric column: its non-missing values in ascending
+    order and the row position of each. A range filter becomes two binary
+    searches and a sort of the matching positions, so its cost grows with the
+    number of matching rows rather than with the table. Persisted as two .npy
+    files that are memory-mapped when loaded.
+    """
+
+    kind = 'sorted'
+    exact = True
+
+    def __init__(self, values: np.ndarray, order: np.ndarray):
+        self.values = values
+        self.order = order
+
+    @property
+    def indexed_rows(self) -> int:
+        return len(self.order)
+
+    @classmethod
+    def build(cls, series: pd.Series) -> Optional["SortedIndex"]:
+        """Index of a numeric column, or None for other column types"""
+        if not _is_numeric(series):
+            return None
+        values = series.to_numpy()
+        order = np.argsort(values, kind='stable')
+        if values.dtype.kind == 'f':
+            # NaN sorts last and never matches a range filter
+            order = order[:len(values) - np.count_nonzero(np.isnan(values))]
+        return cls(values[order], order)
+
+    @classmethod
+    def load(cls, prefix: Path) -> Optional["SortedIndex"]:
+        try:
+            return cls(np.load(f"{prefix}.values.npy", mmap_mode='r'), np.load(f"{prefix}.order.npy", mmap_mode='r'))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, prefix: Path):
+        _write_array(f"{prefix}.order.npy", self.order)
+        _write_array(f"{prefix}.values.npy", self.values)
+
+    def matching_rows(self, predicates: Sequence[Predicate]) -> Optional[np.ndarray]:
+        """
+        Positions of the rows satisfying every range predicate on this column,
+        ascending, or None if a predicate is not a numeric comparison.
+        """
+        low, high = 0, len(self.values)
+        for predicate in predicates:
+            value = predicate.value
+            if predicate.op not in COMPARISONS or not _is_number(value):
+                return None
+            if value != value:
+                # Nothing compares true with NaN
+                return np.zeros(0, dtype=np.int64)
+            if predicate.op in ('>', '>='):
+                low = max(low, int(np.searchsorted(self.values, value, side='right' if predicate.op == '>' else 'left')))
+            else:
+                high = min(high, int(np.searchsorted(self.values, value, side='left' if predicate.op == '<' else 'right')))
+        if low >= high:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(self.order[low:high])
+
+
+class HashIndex:
+    """
+    Case-folded equality index of a column: each distinct value, as lower-cased
+    text, maps to the ascending positions of the rows holding it, so an equals
+    filter becomes a binary search and a slice. Keys are derived exactly as
+    equals_ignore_case_mask compares values, including which missing values
+    read as 'nan' text, and are kept only as 64-bit hashes in ascending order.
+    Rows of keys sharing a hash come back together, so the caller checks the
+    rows with the filter itself (exact = False). Persisted as .npy arrays of
+    the key hashes, the row positions grouped by key and the offset of each
+    group, all memory-mapped when loaded.
+    """
+
+    kind = 'hash'
+    exact = False
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, order: np.ndarray):
+        self.keys = keys
+        self.offsets = offsets
+        self.order = order
+
+    @property
+    def indexed_rows(self) -> int:
+        return len(self.order)
+
+    @classmethod
+    def build(cls, series: pd.Series) -> "HashIndex":
+        if is_dictionary_encoded(series):
+            # Fold the categories once; categories that differ only in case share a key
+            key_codes, keys = pd.factorize(series.cat.categories.astype(str).str.lower())
+            # Missing values (category code -1) pick the -1 appended last
+            codes = np.append(key_codes, -1)[series.cat.codes.to_numpy()]
+        else:
+            # Values that stay missing after conversion to text get code -1 and no key
+            codes, keys = pd.factorize(series.astype(str).str.lower())
+        # Number the keys in hash order, keeping -1 for rows without a key
+        hashes = _hash_keys(keys)
+        by_hash = np.argsort(hashes, kind='stable')
+        rank = np.empty(len(keys) + 1, dtype=np.int64)
+        rank[by_hash] = np.arange(len(keys))
+        rank[-1] = -1
+        codes = rank[codes]
+        # A stable sort keeps the rows of each key in ascending order
+        order = np.argsort(codes, kind='stable')
+        order = order[np.count_nonzero(codes < 0):]
+        counts = np.bincount(codes[codes >= 0], minlength=len(keys))
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        return cls(hashes[by_hash], offsets, order)
+
+    @classmethod
+    def load(cls, prefix: Path) -> Optional["HashIndex"]:
+        try:
+            return cls(*(np.load(f"{prefix}.{part}.npy", mmap_mode='r') for part in ('keys', 'offsets', 'order')))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, prefix: Path):
+        for part in ('offsets', 'order', 'keys'):
+            _write_array(f"{prefix}.{part}.npy", getattr(self, part))
+
+    def matching_rows(self, predicates: Sequence[Predicate]) -> Optional[np.ndarray]:
+        """
+        Ascending positions of the rows whose key hashes like the value, a superset
+        of the rows equal to it ignoring case, or None for other predicates.
+        """
+        if len(predicates) != 1 or predicates[0].op != '=':
+            return None
+        key = _hash_keys([str(predicates[0].value).lower()])[0]
+        first, last = np.searchsorted(self.keys, key, side='left'), np.searchsorted(self.keys, key, side='right')
+        rows = np.asarray(self.order[self.offsets[first]:self.offsets[last]])
+        # Keys sharing a hash are separate groups of rows
+        return np.sort(rows) if last - first > 1 else rows
+
+
+class TrigramIndex:
+    """
+    Trigram inverted index of a text column for contains filters: every
+    three-character substring of the lower-cased values maps to the
+    ascending positions of the rows containing it. A contains filter keeps
+    the rows holding all trigrams of its pattern as candidates, which the
+    caller then checks with the filter itself (exact = False). Only ASCII
+    rows are indexed, as case-insensitive regular expressions can match
+    non-ASCII characters against ASCII ones ('K' for 'k'); other rows are
+    always candidates. Patterns shorter than three characters, non-ASCII
+    or using regex syntax are not looked up and leave the filter to a scan.
+    """
+
+    kind = 'trigram'
+    exact = False
+
+    def __init__(self, trigrams: np.ndarray, offsets: np.ndarray, rows: np.ndarray, unindexed: np.ndarray,
+                 count: np.ndarray):
+        self.trigrams = trigrams
+        self.offsets = offsets
+        self.rows = rows
+        self.unindexed = unindexed
+        # Number of searchable (non-missing) rows, kept as a one-element array like the other parts
+        self.count = count
+
+    @property
+    def indexed_rows(self) -> int:
+        return int(self.count[0])
+
+    @classmethod
+    def build(cls, series: pd.Series) -> "TrigramIndex":
+        # The text the contains filter searches; values still missing after conversion never match
+        texts = series.astype(str).str.lower()
+        present = texts.notna().to_numpy()
+        values = texts.to_numpy()
+        ascii_rows = np.zeros(len(values), dtype=bool)
+        ascii_rows[present] = np.fromiter(
+            (value.isascii() and '\0' not in value for value in values[present]), dtype=bool, count=int(present.sum())
+        )
+        positions = np.flatnonzero(ascii_rows)
+        unindexed = np.flatnonzero(present & ~ascii_rows)
+
+        # All ASCII values in one byte buffer, NUL separated; a trigram is three consecutive non-NUL bytes
+        buffer = np.frombuffer('\0'.join(values[positions]).encode('ascii'), dtype=np.uint8)
+        lengths = np.fromiter((len(value) for value in values[positions]), dtype=np.int64, count=len(positions))
+        row_of_byte = np.repeat(positions, lengths + 1)[:len(buffer)]
+        if len(buffer) >= 3:
+            first, second, third = buffer[:-2], buffer[1:-1], buffer[2:]
+            starts = np.flatnonzero((first != 0) & (second != 0) & (third != 0))
+            codes = (first[starts].astype(np.int64) << 16) | (second[starts].astype(np.int64) << 8) | third[starts]
+            # (trigram, row) pairs sorted by trigram then row, a row repeating a trigram counted once
+            pairs = np.sort((codes << 32) | row_of_byte[starts])
+            pairs = pairs[np.diff(pairs, prepend=-1) != 0]
+        else:
+            pairs = np.zeros(0, dtype=np.int64)
+        codes, rows = pairs >> 32, pairs & 0xFFFFFFFF
+        first_pair = np.flatnonzero(np.diff(codes, prepend=-1))
+        trigrams = codes[first_pair]
+        offsets = np.concatenate((first_pair, [len(pairs)]))
+        return cls(trigrams.astype(np.int32), offsets.astype(np.int64), rows.astype(np.int64), unindexed,
+                   np.array([len(positions) + len(unindexed)], dtype=np.int64))
+
+    @classmethod
+    def load(cls, prefix: Path) -> Optional["TrigramIndex"]:
+        try:
+            return cls(*(np.load(f"{prefix}.{part}.npy", mmap_mode='r')
+                         for part in ('trigrams', 'offsets', 'rows', 'unindexed', 'count')))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, prefix: Path):
+        for part in ('offsets', 'rows', 'unindexed', 'count', 'trigrams'):
+            _write_array(f"{prefix}.{part}.npy", getattr(self, part))
+
+    def matching_rows(self, predicates: Sequence[Predicate]) -> Optional[np.ndarray]:
+        """
+        Ascending positions of the rows that can contain the pattern (a superset
+        of the matches), or None when the pattern cannot be looked up.
+        """
+        if len(predicates) != 1 or predicates[0].op != 'contains':
+            return None
+        pattern = str(predicates[0].value).lower()
+        if len(pattern) < 3 or not pattern.isascii() or '\0' in pattern or REGEX_METACHARACTERS.intersection(pattern):
+            return None
+        codes = {(ord(pattern[i]) << 16) | (ord(pattern[i + 1]) << 8) | ord(pattern[i + 2])
+                 for i in range(len(pattern) - 2)}
+        postings = []
+        for code in codes:
+            slot = int(np.searchsorted(self.trigrams, code))
+            if slot == len(self.trigrams) or self.trigrams[slot] != code:
+                return np.asarray(self.unindexed)
+            postings.append(self.rows[self.offsets[slot]:self.offsets[slot + 1]])
+        # Intersect the rarest trigrams first so the candidate set shrinks fast
+        postings.sort(key=len)
+        candidates = np.asarray(postings[0])
+        for posting in postings[1:]:
+            candidates = candidates[np.isin(candidates, posting, assume_unique=True)]
+        return np.union1d(candidates, self.unindexed)
+
+
+class BitmapIndex:
+    """
+    Compressed bitmap index of a dictionary-encoded (low-cardinality) text
+    column, one bitmap of rows per distinct value, laid out roaring style:
+    rows are split into chunks of 65,536 and a value's rows within a chunk
+    are kept as sorted 16-bit offsets when there are at most 4,096 of them,
+    else as a 1,024-word bitmap. Equality filters OR the bitmaps of the
+    values equal to theirs ignoring case and AND the bitmaps of several
+    predicates; count_by reads the row count of each value. Neither touches
+    the column itself.
+    """
+
+    kind = 'bitmap'
+    exact = True
+    _PARTS = ('counts', 'value_offsets', 'chunks', 'cardinalities', 'slots', 'arrays', 'bitmaps', 'length')
+
+    def __init__(self, keys: List[str], counts: np.ndarray, value_offsets: np.ndarray, chunks: np.ndarray,
+                 cardinalities: np.ndarray, slots: np.ndarray, arrays: np.ndarray, bitmaps: np.ndarray,
+                 length: np.ndarray):
+        self.keys = keys
+        # Rows holding each value
+        self.counts = counts
+        # Containers (one value in one chunk) grouped by value, then ascending chunk
+        self.value_offsets = value_offsets
+        self.chunks = chunks
+        self.cardinalities = cardinalities
+        # Start in arrays of a sparse container, number of the bitmap of a dense one
+        self.slots = slots
+        self.arrays = arrays
+        self.bitmaps = bitmaps
+        # Rows of the column, kept as a one-element array like the other parts
+        self.length = length
+        self._codes: Dict[str, List[int]] = {}
+        for code, key in enumerate(keys):
+            self._codes.setdefault(key.lower(), []).append(code)
+
+    @property
+    def indexed_rows(self) -> int:
+        return int(np.sum(self.counts))
+
+    @classmethod
+    def build(cls, series: pd.Series) -> Optional["BitmapIndex"]:
+        if not is_dictionary_encoded(series) or series.cat.categories.inferred_type not in ('string', 'empty'):
+            return None
+        keys = [str(key) for key in series.cat.categories]
+        narrow_codes = series.cat.codes.to_numpy()
+        codes = narrow_codes.astype(np.int64)
+        # Rows grouped by value, ascending within each; missing values (code -1) have no bitmap
+        order = np.argsort(narrow_codes, kind='stable')
+        order = order[np.count_nonzero(codes < 0):]
+        counts = np.bincount(codes[order], minlength=len(keys))
+        chunk_count = (len(codes) >> BITMAP_CHUNK_BITS) + 1
+        container_keys = codes[order] * chunk_count + (order >> BITMAP_CHUNK_BITS)
+        starts = np.flatnonzero(np.diff(container_keys, prepend=-1))
+        cardinalities = np.diff(np.append(starts, len(order)))
+        chunks = order[starts] >> BITMAP_CHUNK_BITS
+        value_offsets = np.searchsorted(codes[order[starts]], np.arange(len(keys) + 1))
+
+        dense = cardinalities > BITMAP_ARRAY_MAX_ROWS
+        sparse_sizes = np.where(dense, 0, cardinalities)
+        slots = np.where(dense, np.cumsum(dense) - 1, np.cumsum(sparse_sizes) - sparse_sizes)
+        in_bitmap = np.repeat(dense, cardinalities)
+        offsets = order & ((1 << BITMAP_CHUNK_BITS) - 1)
+        arrays = offsets[~in_bitmap].astype(np.uint16)
+        bitmaps = np.zeros(np.count_nonzero(dense) * BITMAP_CHUNK_WORDS, dtype=np.uint64)
+        _set_bits(bitmaps, np.repeat(slots, cardinalities)[in_bitmap] * BITMAP_CHUNK_WORDS * 64 + offsets[in_bitmap])
+        return cls(keys, counts, value_offsets, chunks, cardinalities, slots, arrays, bitmaps,
+                   np.array([len(codes)], dtype=np.int64))
+
+    @classmethod
+    def load(cls, prefix: Path) -> Optional["BitmapIndex"]:
+        try:
+            parts = [np.load(f"{prefix}.{part}.npy", mmap_mode='r') for part in cls._PARTS]
+            with open(f"{prefix}.keys.json", encoding='utf-8') as f:
+                keys = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return cls(keys, *parts)
+
+    def save(self, prefix: Path):
+        for part in self._PARTS:
+            _write_array(f"{prefix}.{part}.npy", getattr(self, part))
+        _write_file(f"{prefix}.keys.json", lambda f: f.write(json.dumps(self.keys).encode('utf-8')))
+
+    def matching_rows(self, predicates: Sequence[Predicate]) -> Optional[np.ndarray]:
+        """
+        Ascending positions of the rows equal to every predicate's value ignoring
+        case, or None when a predicate is not an equality.
+        """
+        if not predicates or any(predicate.op != '=' for predicate in predicates):
+            return None
+        words = None
+        for predicate in predicates:
+            bitmap = self.bitmap(self._codes.get(str(predicate.value).lower(), []))
+            words = bitmap if words is None else words & bitmap
+        # Only words with a bit set are unpacked, so rare values stay cheap
+        nonzero = np.flatnonzero(words)
+        bits = np.flatnonzero(np.unpackbits(words[nonzero].astype('<u8').view(np.uint8), bitorder='little'))
+        return nonzero[bits >> 6] * 64 + (bits & 63)
+
+    def bitmap(self, codes: Sequence[int]) -> np.ndarray:
+        """Uncompressed bitmap, 64 rows per word, of the rows holding any of the values"""
+        words = np.zeros(((int(self.length[0]) >> BITMAP_CHUNK_BITS) + 1) * BITMAP_CHUNK_WORDS, dtype=np.uint64)
+        chunk_words = words.reshape(-1, BITMAP_CHUNK_WORDS)
+        bitmaps = self.bitmaps.reshape(-1, BITMAP_CHUNK_WORDS)
+        for code in codes:
+            containers = slice(self.value_offsets[code], self.value_offsets[code + 1])
+            chunks = np.asarray(self.chunks[containers])
+            cardinalities = np.asarray(self.cardinalities[containers])
+            slots = np.asarray(self.slots[containers])
+            dense = cardinalities > BITMAP_ARRAY_MAX_ROWS
+            # A value has one container per chunk, so these chunks are distinct
+            chunk_words[chunks[dense]] |= bitmaps[slots[dense]]
+            sizes = cardinalities[~dense]
+            ends = np.cumsum(sizes)
+            positions = np.arange(ends[-1] if len(ends) else 0) + np.repeat(slots[~dense] - (ends - sizes), sizes)
+            _set_bits(words, np.repeat(chunks[~dense] << BITMAP_CHUNK_BITS, sizes) + self.arrays[positions])
+        return words
+
+    def value_counts(self) -> pd.Series:
+        """Rows per value, most frequent first, as count_values counts the column"""
+        counts = np.asarray(self.counts)
+        present = counts > 0
+        result = pd.Series(counts[present], index=pd.Index(np.array(self.keys, dtype=object)[present]), name='count')
+        return result.sort_values(ascending=False, kind='stable')
+
+
+INDEX_TYPES = {index_type.kind: index_type for index_type in (SortedIndex, HashIndex, TrigramIndex, BitmapIndex)}
+
+
+class IndexStore:
+    """
+    Secondary indexes of dataset content for Sankalp DBMS.
+    Indexes are built from a dataset's column on request, written next to the
+    dataset's files in {content_key}.indexes/ and memory-mapped once per
+    process. Index files are named after the version of the file they were
+    built from, so rewriting the dataset makes them stale and they are rebuilt;
+    loading a version drops the indexes of older versions from memory.
+    """
+
+    def __init__(self):
+        self._loaded: Dict[Tuple[str, Hashable, str, str], Any] = {}
+        # Distinct keys of columns whose index was not built for having more than max_keys
+        self._too_many_keys: Dict[Tuple[str, Hashable, str, str], int] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    def get(self, dataset: Dict, column: str, kind: str, build: bool = False, max_keys: Optional[int] = None):
+        """
+        Index of a kind in INDEX_TYPES on a dataset column, loaded from disk or,
+        with build=True, built and persisted when there is none. With max_keys,
+        a hash or bitmap index is only built if the column has at most that many
+        distinct keys. None when the column has no such index or cannot be
+        indexed that way.
+        """
+        version = dataset_version(dataset)
+        key = (content_key(dataset), version, column, kind)
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+        prefix = self._prefix(dataset, column, kind, version)
+        index = INDEX_TYPES[kind].load(prefix)
+        if index is None:
+            with self._lock:
+                too_many = max_keys is not None and self._too_many_keys.get(key, 0) > max_keys
+            if not build or too_many:
+                return None
+            index = self._build(key, dataset, prefix, max_keys)
+            if index is None and key in self._too_many_keys:
+                # Not cached, a later request without the limit may still build it
+                return None
+        with self._lock:
+            self._forget_other_versions(key)
+            self._loaded[key] = index
+        return index
+
+    def remove(self, dataset: Dict):
+        """Drop every index of a dataset's content, in memory and on disk"""
+        key = content_key(dataset)
+        with self._lock:
+            for loaded_key in [loaded_key for loaded_key in self._loaded if loaded_key[0] == key]:
+                del self._loaded[loaded_key]
+            for declined_key in [declined_key for declined_key in self._too_many_keys if declined_key[0] == key]:
+                del self._too_many_keys[declined_key]
+        shutil.rmtree(self._directory(dataset), ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            loaded = [index for index in self._loaded.values() if index is not None]
+            return {
+                "loaded": {kind: sum(1 for index in loaded if index.kind == kind) for kind in INDEX_TYPES},
+                "builds": self.builds,
+                "build_seconds": round(self.build_seconds, 3)
+            }
+
+    def _build(self, key: Tuple[str, Hashable, str, str], dataset: Dict, prefix: Path, max_keys: Optional[int] = None):
+        _, _, column, kind = key
+        started = time.perf_counter()
+        frame = load_dataset(dataset, columns=[column])
+        index = INDEX_TYPES[kind].build(frame[column]) if isinstance(frame[column], pd.Series) else None
+        if index is None:
+            return None
+        if max_keys is not None and len(index.keys) > max_keys:
+            with self._lock:
+                self._forget_other_versions(key)
+                self._too_many_keys[key] = len(index.keys)
+            print(f"Not indexing {column} of {content_key(dataset)}: {len(index.keys)} distinct keys exceed {max_keys}")
+            return None
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        # Files built from other versions of the column are stale
+        for stale in prefix.parent.glob(f"{prefix.name.rsplit('.', 1)[0]}.*"):
+            if not stale.name.startswith(f"{prefix.name}."):
+                stale.unlink(missing_ok=True)
+        index.save(prefix)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.builds += 1
+            self.build_seconds += elapsed
+        print(f"Built {kind} index on {column} of {content_key(dataset)} ({index.indexed_rows} rows) in {elapsed:.2f}s")
+        return INDEX_TYPES[kind].load(prefix) or index
+
+    def _forget_other_versions(self, key: Tuple[str, Hashable, str, str]):
+        """Drop what is held for other versions of this index; they are never used again. Called with the lock held"""
+        for held in (self._loaded, self._too_many_keys):
+            for other in [other for other in held if other[0] == key[0] and other[2:] == key[2:] and other != key]:
+                del held[other]
+
+    def _directory(self, dataset: Dict) -> Path:
+        stored_file = dataset.get("columnar_path") or dataset["file_path"]
+        return Path(stored_file).parent / f"{content_key(dataset)}.indexes"
+
+    def _prefix(self, dataset: Dict, column: str, kind: str, version: Hashable) -> Path:
+        # Column names are hashed, they may hold any character
+        digest = hashlib.sha1(column.encode('utf-8')).hexdigest()[:16]
+        version_token = '-'.join(str(part) for part in version)
+        return self._directory(dataset) / f"{kind}.{digest}.{version_token}"
+
+
+def _write_file(path: str, write: Callable[[Any], Any]):
+    """Write under a temporary name and rename, so readers never see a partial file"""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _write_array(path: str, array: np.ndarray):
+    _write_file(path, lambda f: np.save(f, array))
+
+
+def _set_bits(words: np.ndarray, positions: np.ndarray):
+    """Set bits, numbered from the lowest bit of the first word, at ascending positions"""
+    if not len(positions):
+        return
+    word_numbers = positions >> 6
+    first = np.flatnonzero(np.diff(word_numbers, prepend=-1))
+    # The bits set in one word are distinct, so their sum is their OR
+    bits = np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64))
+    words[word_numbers[first]] |= np.add.reduceat(bits, first)
+
+
+def _hash_keys(keys: Sequence[str]) -> np.ndarray:
+    """Stable 64-bit hashes of text keys, the same in every process"""
+    return pd.util.hash_array(np.asarray(keys, dtype=object), categorize=False)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    """NumPy-backed integer and float columns; booleans and nullable extension types are left out"""
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in 'iuf'
+
+
+def zone_map(df: pd.DataFrame, column: str) -> Optional[ZoneMap]:
+    """
+    Zone map of a column of a cached frame, built on first use and kept for
+    as long as the frame stays cached. None for frames outside the cache and
+    columns that cannot be summarised.
+    """
+    derived = dataset_cache.derived(df)
+    if derived is None or column not in df.columns:
+        return None
+    key = ('zone_map', column)
+    if key not in derived:
+        series = df[column]
+        derived[key] = ZoneMap(series) if isinstance(series, pd.Series) and ZoneMap.supports(series) else None
+    return derived[key]
+
+
+def range_filter(df: pd.DataFrame, predicates: Sequence[Predicate]) -> pd.DataFrame:
+    """
+    Rows of df satisfying every range predicate ('>', '<', '>=', '<=') on one
+    column, the same rows in the same order as a boolean mask would select.
+    Cached frames skip the blocks their zone map rules out.
+    """
+    summary = zone_map(df, predicates[0].column)
+    positions = summary.matching_rows(predicates) if summary is not None else None
+    if positions is None:
+        return df[predicates_mask(df, predicates)]
+    return df.iloc[positions]
+
+
+# Indexes shared by all query requests of this process
+index_store = IndexStore()
@@ -0,0 +1,96 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+
+class IngestJob:
+    """
+    Progress of one background ingest: parsing, metadata extraction and
+    columnar conversion of an uploaded file.
+    """
+
+    def __init__(self, dataset_id: str, total_bytes: int):
+        self.dataset_id = dataset_id
+        self.state = "queued"
+        self.total_bytes = total_bytes
+        self.bytes_parsed = 0
+        self.rows_seen = 0
+        self.error: Optional[str] = None
+        self.submitted_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.future: Optional[Future] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def report(self, bytes_parsed: int, rows_seen: int):
+        """Progress callback handed to the loaders"""
+        self.bytes_parsed = bytes_parsed
+        self.rows_seen = rows_seen
+
+    def throughput_mb_s(self) -> Optional[float]:
+        """Parse throughput so far, or of the whole ingest once finished"""
+        if self._started is None:
+            return None
+        elapsed = (self._finished or time.monotonic()) - self._started
+        return round(self.bytes_parsed / (1024 * 1024) / elapsed, 2) if elapsed > 0 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dataset_id": self.dataset_id,
+            "state": self.state,
+            "bytes_parsed": self.bytes_parsed,
+            "total_bytes": self.total_bytes,
+            "rows_seen": self.rows_seen,
+            "progress": (self.bytes_parsed / self.total_bytes) if self.total_bytes else 0.0,
+            "throughput_mb_s": self.throughput_mb_s(),
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+
+class IngestJobManager:
+    """
+    Runs ingest jobs on a bounded thread pool so uploads return immediately
+    and parsing never blocks the event loop.
+    """
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self._jobs: Dict[str, IngestJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, dataset_id: str, total_bytes: int, work: Callable[[IngestJob], None]) -> IngestJob:
+        """Queue work(job) for a dataset; work reports progress through the job"""
+        job = IngestJob(dataset_id, total_bytes)
+        with self._lock:
+            self._jobs[dataset_id] = job
+        job.future = self._executor.submit(self._run, job, work)
+        return job
+
+    def get(self, dataset_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(dataset_id)
+
+    def forget(self, dataset_id: str):
+        with self._lock:
+            self._jobs.pop(dataset_id, None)
+
+    def _run(self, job: IngestJob, work: Callable[[IngestJob], None]):
+        job.state = "ingesting"
+        job.started_at = datetime.now().isoformat()
+        job._started = time.monotonic()
+        try:
+            work(job)
+            job.bytes_parsed = job.total_bytes
+            job.state = "ready"
+        except Exception as e:
+            job.error = str(e)
+            job.state = "failed"
+        finally:
+            job._finished = time.monotonic()
+            job.finished_at = datetime.now().isoformat()
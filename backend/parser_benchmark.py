@@ -0,0 +1,102 @@
+"""
+Parse-latency micro-benchmark for the Sankalp DBMS query parser.
+
+Times QueryParser.parse on one query of every supported form, then again
+after registering a few hundred extra keyword rules, to check that dispatch
+cost stays flat as query forms are added, and the same queries answered
+from a warm PlanCache.
+
+    python parser_benchmark.py --repeat 20000 --output parser.json
+"""
+import argparse
+import json
+import sys
+import timeit
+from typing import Dict
+
+from query_parser import QueryParser, PlanCache
+
+QUERY_FORMS = {
+    'show_all': "show all data",
+    'show_first': "show first 10",
+    'show_last': "show last 5",
+    'count': "count total records",
+    'columns': "show columns",
+    'describe': "describe data",
+    'filter_greater': "where age greater than 25",
+    'filter_less': "where price less than 100",
+    'filter_between': "where price between 10 and 100",
+    'filter_equal': "where city equals new york",
+    'filter_contains': "where name contains john",
+    'average': "calculate average of salary by department",
+    'sum': "sum revenue by region",
+    'max': "maximum price by category",
+    'min': "minimum age",
+    'count_by': "count records by department",
+    'sort': "order by salary descending",
+    'bar_chart': "bar chart of sales by region",
+    'line_chart': "line chart of revenue by month",
+    'pie_chart': "pie chart of category",
+    'scatter_plot': "scatter plot of price vs quantity",
+    'unrecognised': "hello world"
+}
+EXTRA_FORMS = 500
+
+
+def measure(parser: QueryParser, repeat: int) -> Dict[str, float]:
+    """Best-of-5 parse latency per query form in microseconds"""
+    timings = {}
+    for form, query in QUERY_FORMS.items():
+        expected = None if form == 'unrecognised' else form
+        plan = parser.parse(query)
+        if (plan.operation if plan else None) != expected:
+            raise SystemExit(f"'{query}' parsed as {plan}, expected {expected}")
+        best = min(timeit.repeat(lambda: parser.parse(query), number=repeat, repeat=5))
+        timings[form] = best / repeat * 1_000_000
+    return timings
+
+
+def measure_cached(parser: QueryParser, repeat: int) -> Dict[str, float]:
+    """Best-of-5 plan cache hit latency per query form in microseconds"""
+    cache = PlanCache(len(QUERY_FORMS))
+    timings = {}
+    for form, query in QUERY_FORMS.items():
+        cache.get_or_parse(query, parser.parse)
+        best = min(timeit.repeat(lambda: cache.get_or_parse(query, parser.parse), number=repeat, repeat=5))
+        timings[form] = best / repeat * 1_000_000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure query parse latency per query form")
+    parser.add_argument("--repeat", type=int, default=20000, help="parses per timing")
+    parser.add_argument("--output", help="write the measurements as JSON to this file")
+    args = parser.parse_args()
+
+    query_parser = QueryParser()
+    baseline = measure(query_parser, args.repeat)
+    cached = measure_cached(query_parser, args.repeat)
+
+    # Forms that never match these queries only cost a dictionary miss per token
+    for i in range(EXTRA_FORMS):
+        query_parser._register(f"keyword{i}", lambda tokens, index: None)
+    extended = measure(query_parser, args.repeat)
+
+    print(f"{'form':<16}{'parse us':>10}{f'+{EXTRA_FORMS} forms':>14}{'cached us':>11}")
+    for form in QUERY_FORMS:
+        print(f"{form:<16}{baseline[form]:>10.2f}{extended[form]:>14.2f}{cached[form]:>11.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "repeat": args.repeat,
+                "parse_us": baseline,
+                "parse_us_with_extra_forms": extended,
+                "cached_us": cached,
+                "extra_forms": EXTRA_FORMS
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
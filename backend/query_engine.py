@@ -1,87 +1,59 @@
 
 import pandas as pd
 import numpy as np
-import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
 
+from file_utils import load_dataset, load_dataset_columns, iter_dataset_chunks, estimate_memory_bytes, is_cached, take_rows
+from streaming_executor import StreamingExecutor
+from column_ops import equals_ignore_case_mask, count_values, predicates_mask
+from query_parser import QueryParser, QueryPlan, Predicate, PlanCache, normalize_query, describe_condition
+from indexes import range_filter, index_store
+
+# Operations answered from an index of their column when it has one, and the kinds of index tried in order
+INDEXED_OPERATIONS = {
+    'filter_greater': ('sorted',), 'filter_less': ('sorted',), 'filter_between': ('sorted',),
+    'filter_equal': ('bitmap', 'hash'), 'filter_contains': ('trigram',), 'count_by': ('bitmap',)
+}
+# Dataset metadata listing the columns each kind of index is built for automatically
+INDEXABLE_COLUMNS = {'sorted': 'numeric_columns', 'hash': 'column_names', 'trigram': 'categorical_columns'}
+
 class SankalpQueryEngine:
     """
     Natural Language Query Engine for Sankalp DBMS
     Processes English-like queries and converts them to data operations
     """
     
-    def __init__(self):
-        self.query_patterns = {
-            # Basic operations
-            'show_all': [r'show\s+(?:me\s+)?all\s+(?:data|records)?', r'display\s+(?:all\s+)?(?:data|records)', r'select\s+all'],
-            'show_first': [r'show\s+(?:me\s+)?(?:first\s+|top\s+)?(\d+)', r'display\s+(?:first\s+|top\s+)?(\d+)'],
-            'show_last': [r'show\s+(?:me\s+)?(?:last\s+|bottom\s+)?(\d+)', r'display\s+(?:last\s+|bottom\s+)?(\d+)'],
-            'count': [r'count\s+(?:total\s+)?(?:records|rows)', r'how\s+many\s+(?:records|rows)'],
-            'columns': [r'show\s+(?:me\s+)?columns?', r'what\s+(?:are\s+)?(?:the\s+)?columns?', r'list\s+columns?'],
-            'describe': [r'describe\s+(?:the\s+)?data', r'summary\s+of\s+data', r'data\s+info'],
-            
-            # Filtering
-            'filter_greater': [r'where\s+(\w+)\s+(?:is\s+)?(?:greater\s+than|>)\s+(\d+\.?\d*)', 
-                              r'(\w+)\s+(?:greater\s+than|>)\s+(\d+\.?\d*)',
-                              r'filter\s+(\w+)\s+(?:greater\s+than|>)\s+(\d+\.?\d*)'],
-            'filter_less': [r'where\s+(\w+)\s+(?:is\s+)?(?:less\s+than|<)\s+(\d+\.?\d*)',
-                           r'(\w+)\s+(?:less\s+than|<)\s+(\d+\.?\d*)',
-                           r'filter\s+(\w+)\s+(?:less\s+than|<)\s+(\d+\.?\d*)'],
-            'filter_equal': [r'where\s+(\w+)\s+(?:is\s+)?(?:equal\s+to|equals?|=)\s+["\']?([^"\']+)["\']?',
-                            r'(\w+)\s+(?:equal\s+to|equals?|=)\s+["\']?([^"\']+)["\']?',
-                            r'filter\s+(\w+)\s+(?:equal\s+to|equals?|=)\s+["\']?([^"\']+)["\']?'],
-            'filter_contains': [r'where\s+(\w+)\s+contains\s+["\']?([^"\']+)["\']?',
-                               r'(\w+)\s+contains\s+["\']?([^"\']+)["\']?',
-                               r'filter\s+(\w+)\s+containing\s+["\']?([^"\']+)["\']?'],
-            
-            # Aggregation
-            'average': [r'(?:calculate\s+)?average\s+(?:of\s+)?(\w+)(?:\s+by\s+(\w+))?',
-                       r'mean\s+(?:of\s+)?(\w+)(?:\s+by\s+(\w+))?',
-                       r'avg\s+(\w+)(?:\s+by\s+(\w+))?'],
-            'sum': [r'(?:calculate\s+)?sum\s+(?:of\s+)?(\w+)(?:\s+by\s+(\w+))?',
-                   r'total\s+(?:of\s+)?(\w+)(?:\s+by\s+(\w+))?'],
-            'max': [r'(?:find\s+)?maximum\s+(?:of\s+)?(\w+)(?:\s+by\s+(\w+))?',
-                   r'max\s+(\w+)(?:\s+by\s+(\w+))?',
-                   r'highest\s+(\w+)(?:\s+by\s+(\w+))?'],
-            'min': [r'(?:find\s+)?minimum\s+(?:of\s+)?(\w+)(?:\s+by\s+(\w+))?',
-                   r'min\s+(\w+)(?:\s+by\s+(\w+))?',
-                   r'lowest\s+(\w+)(?:\s+by\s+(\w+))?'],
-            'count_by': [r'count\s+(?:records|rows)?\s+by\s+(\w+)',
-                        r'count\s+(\w+)\s+(?:by\s+category|by\s+group)',
-                        r'group\s+by\s+(\w+)\s+and\s+count'],
-            
-            # Sorting
-            'sort_asc': [r'sort\s+by\s+(\w+)(?:\s+(?:ascending|asc))?',
-                        r'order\s+by\s+(\w+)(?:\s+(?:ascending|asc))?'],
-            'sort_desc': [r'sort\s+by\s+(\w+)\s+(?:descending|desc)',
-                         r'order\s+by\s+(\w+)\s+(?:descending|desc)'],
-            
-            # Visualization
-            'bar_chart': [r'(?:create\s+|show\s+|make\s+)?bar\s+chart\s+of\s+(\w+)(?:\s+by\s+(\w+))?',
-                         r'bar\s+graph\s+(?:of\s+)?(\w+)(?:\s+by\s+(\w+))?'],
-            'line_chart': [r'(?:create\s+|show\s+|make\s+)?line\s+chart\s+of\s+(\w+)(?:\s+by\s+(\w+))?',
-                          r'line\s+graph\s+(?:of\s+)?(\w+)(?:\s+by\s+(\w+))?'],
-            'pie_chart': [r'(?:create\s+|show\s+|make\s+)?pie\s+chart\s+of\s+(\w+)',
-                         r'pie\s+graph\s+(?:of\s+)?(\w+)'],
-            'scatter_plot': [r'(?:create\s+|show\s+|make\s+)?scatter\s+plot\s+of\s+(\w+)\s+(?:vs|versus|against)\s+(\w+)',
-                            r'scatter\s+chart\s+(\w+)\s+(?:vs|versus|against)\s+(\w+)']
-        }
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        # Live server configuration, read on every query
+        self.config = config if config is not None else {}
+        self.streaming_executor = StreamingExecutor()
+        self.parser = QueryParser()
+        self.plan_cache = PlanCache(int(self.config.get("plan_cache_entries", 1024)))
     
-    async def execute_query(self, query: str, dataset: Dict) -> Dict[str, Any]:
-        """Execute a natural language query on the dataset"""
+    async def execute_query(self, query: str, dataset: Dict, plan: Optional[QueryPlan] = None) -> Dict[str, Any]:
+        """Execute a natural language query on the dataset, reusing its plan when the caller already parsed it"""
         start_time = datetime.now()
         
         try:
-            # Load the dataset
-            df = self._load_dataset(dataset)
-            
             # Clean and normalize the query
-            normalized_query = query.lower().strip()
+            normalized_query = normalize_query(query)
             
-            # Match query pattern and execute
-            result = self._match_and_execute_query(normalized_query, df)
+            # Parse first so only the needed columns/rows are loaded
+            if plan is None:
+                plan = self._parse_query(normalized_query)
+            
+            # Filters on indexed columns read only the matching rows
+            result = self._execute_indexed(plan, dataset)
+            if result is None and self._should_stream(plan, dataset):
+                # Too large to materialise, process the file chunk by chunk
+                result = self._execute_streaming(plan, dataset)
+            elif result is None:
+                df = self._load_dataset(dataset, **self._load_hints(plan, dataset))
+                
+                # Execute the planned operation
+                result = self._execute_parsed_query(plan, normalized_query, df)
             
             execution_time = (datetime.now() - start_time).total_seconds()
             
@@ -101,152 +73,148 @@ class SankalpQueryEngine:
                 "execution_time": (datetime.now() - start_time).total_seconds()
             }
     
-    def _load_dataset(self, dataset: Dict) -> pd.DataFrame:
-        """Load dataset from file path"""
-        file_path = dataset["file_path"]
-        file_type = dataset["file_type"]
-        
-        if file_type == 'csv':
-            return pd.read_csv(file_path)
-        elif file_type == 'json':
-            return pd.read_json(file_path)
-        elif file_type in ['xlsx', 'xls']:
-            return pd.read_excel(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
+    def plan_query(self, query: str) -> Optional[QueryPlan]:
+        """Query plan for a natural language query, or None if it is not understood"""
+        return self._parse_query(normalize_query(query))
     
-    def _match_and_execute_query(self, query: str, df: pd.DataFrame) -> Dict[str, Any]:
-        """Match query pattern and execute corresponding operation"""
-        
-        # Basic operations
-        if self._matches_pattern(query, 'show_all'):
-            return self._show_all(df)
-        
-        elif self._matches_pattern(query, 'show_first'):
-            match = self._extract_match(query, 'show_first')
-            n = int(match.group(1)) if match else 10
-            return self._show_first_n(df, n)
-        
-        elif self._matches_pattern(query, 'show_last'):
-            match = self._extract_match(query, 'show_last')
-            n = int(match.group(1)) if match else 10
-            return self._show_last_n(df, n)
-        
-        elif self._matches_pattern(query, 'count'):
-            return self._count_records(df)
-        
-        elif self._matches_pattern(query, 'columns'):
-            return self._show_columns(df)
-        
-        elif self._matches_pattern(query, 'describe'):
-            return self._describe_data(df)
-        
-        # Filtering operations
-        elif self._matches_pattern(query, 'filter_greater'):
-            match = self._extract_match(query, 'filter_greater')
-            if match:
-                column, value = match.group(1), float(match.group(2))
-                return self._filter_greater_than(df, column, value)
-        
-        elif self._matches_pattern(query, 'filter_less'):
-            match = self._extract_match(query, 'filter_less')
-            if match:
-                column, value = match.group(1), float(match.group(2))
-                return self._filter_less_than(df, column, value)
-        
-        elif self._matches_pattern(query, 'filter_equal'):
-            match = self._extract_match(query, 'filter_equal')
-            if match:
-                column, value = match.group(1), match.group(2)
-                return self._filter_equal(df, column, value)
-        
-        elif self._matches_pattern(query, 'filter_contains'):
-            match = self._extract_match(query, 'filter_contains')
-            if match:
-                column, value = match.group(1), match.group(2)
-                return self._filter_contains(df, column, value)
-        
-        # Aggregation operations
-        elif self._matches_pattern(query, 'average'):
-            match = self._extract_match(query, 'average')
-            if match:
-                column = match.group(1)
-                group_by = match.group(2) if match.lastindex > 1 else None
-                return self._calculate_average(df, column, group_by)
-        
-        elif self._matches_pattern(query, 'sum'):
-            match = self._extract_match(query, 'sum')
-            if match:
-                column = match.group(1)
-                group_by = match.group(2) if match.lastindex > 1 else None
-                return self._calculate_sum(df, column, group_by)
-        
-        elif self._matches_pattern(query, 'max'):
-            match = self._extract_match(query, 'max')
-            if match:
-                column = match.group(1)
-                group_by = match.group(2) if match.lastindex > 1 else None
-                return self._calculate_max(df, column, group_by)
-        
-        elif self._matches_pattern(query, 'min'):
-            match = self._extract_match(query, 'min')
-            if match:
-                column = match.group(1)
-                group_by = match.group(2) if match.lastindex > 1 else None
-                return self._calculate_min(df, column, group_by)
-        
-        elif self._matches_pattern(query, 'count_by'):
-            match = self._extract_match(query, 'count_by')
-            if match:
-                column = match.group(1)
-                return self._count_by_group(df, column)
-        
-        # Visualization operations
-        elif self._matches_pattern(query, 'bar_chart'):
-            match = self._extract_match(query, 'bar_chart')
-            if match:
-                y_column = match.group(1)
-                x_column = match.group(2) if match.lastindex > 1 else None
-                return self._create_bar_chart(df, y_column, x_column)
+    def _load_dataset(self, dataset: Dict, columns: Optional[List[str]] = None,
+                      nrows: Optional[int] = None, tail: Optional[int] = None,
+                      predicates: Optional[Tuple[Predicate, ...]] = None) -> pd.DataFrame:
+        """Load dataset through the shared dataset cache, with optional projection/limit/predicate pushdown"""
+        return load_dataset(dataset, columns=columns, nrows=nrows, tail=tail, predicates=predicates)
+    
+    def _should_stream(self, plan: Optional[QueryPlan], dataset: Dict) -> bool:
+        """Use chunked execution when the dataset is estimated to be too large for memory"""
+        if plan is None or plan.operation not in StreamingExecutor.STREAMABLE_OPERATIONS:
+            return False
+        threshold_mb = self.config.get("streaming_threshold_mb")
+        if not threshold_mb or is_cached(dataset):
+            return False
+        return estimate_memory_bytes(dataset) > float(threshold_mb) * 1024 * 1024
+    
+    def _execute_streaming(self, plan: QueryPlan, dataset: Dict) -> Dict[str, Any]:
+        """Execute a query plan out of core with the streaming executor"""
+        chunk_rows = int(self.config.get("streaming_chunk_rows", 100_000))
+        return self.streaming_executor.execute(
+            plan,
+            load_dataset_columns(dataset),
+            lambda columns: iter_dataset_chunks(dataset, columns=columns, chunk_rows=chunk_rows, predicates=plan.predicates)
+        )
+    
+    def _execute_indexed(self, plan: Optional[QueryPlan], dataset: Dict) -> Optional[Dict[str, Any]]:
+        """
+        Answer a filter or count_by from an index of its column (sorted for
+        range filters, bitmap or hash for equality, trigram for contains,
+        bitmap for count_by), reading only the matching rows, or None when the
+        column has no usable index. Large datasets get the index built on the
+        first such query.
+        """
+        if plan is None or plan.operation not in INDEXED_OPERATIONS:
+            return None
+        index = None
+        for kind in INDEXED_OPERATIONS[plan.operation]:
+            # Automatic hash indexes are limited to columns with a bounded number of distinct values
+            max_keys = int(self.config.get("hash_index_max_keys") or 0) if kind == 'hash' else 0
+            index = index_store.get(dataset, plan.column, kind, build=self._builds_index(dataset, plan.column, kind),
+                                    max_keys=max_keys or None)
+            if index is not None:
+                break
+        if index is None:
+            return None
+        if plan.operation == 'count_by':
+            return self._grouped_count_result(index.value_counts(), plan.column)
+        rows = index.matching_rows(plan.predicates)
+        if rows is None:
+            return None
+        filtered_df = take_rows(dataset, rows)
+        if not index.exact:
+            # The index narrowed the scan to candidate rows, the filter itself decides
+            filtered_df = filtered_df[predicates_mask(filtered_df, plan.predicates)]
+        return self._filter_result(filtered_df, describe_condition(plan.predicates))
+    
+    def _builds_index(self, dataset: Dict, column: str, kind: str) -> bool:
+        """Whether a query on the column builds a missing index of this kind"""
+        metadata = dataset.get("metadata") or {}
+        min_rows = int(self.config.get(f"{kind}_index_min_rows") or 0)
+        if min_rows <= 0 or metadata.get("rows", 0) < min_rows:
+            return False
+        if kind == 'bitmap':
+            # Low-cardinality text is dictionary encoded at upload
+            return metadata.get("column_types", {}).get(column) == 'category'
+        return column in metadata.get(INDEXABLE_COLUMNS[kind], [])
+    
+    def _load_hints(self, plan: Optional[QueryPlan], dataset: Dict) -> Dict[str, Any]:
+        """Work out which columns and rows a query plan needs so the loader can skip the rest"""
+        if plan is None:
+            # Unrecognised queries only report an error, the header is enough
+            return {"nrows": 0}
         
-        elif self._matches_pattern(query, 'line_chart'):
-            match = self._extract_match(query, 'line_chart')
-            if match:
-                y_column = match.group(1)
-                x_column = match.group(2) if match.lastindex > 1 else None
-                return self._create_line_chart(df, y_column, x_column)
+        operation = plan.operation
+        if operation == 'show_first':
+            return {"nrows": plan.limit}
+        if operation == 'show_last':
+            return {"tail": plan.limit}
+        if operation in ('columns', 'bar_chart', 'line_chart', 'pie_chart', 'scatter_plot'):
+            return {"nrows": 0}
         
-        elif self._matches_pattern(query, 'pie_chart'):
-            match = self._extract_match(query, 'pie_chart')
-            if match:
-                column = match.group(1)
-                return self._create_pie_chart(df, column)
+        known_columns = dataset.get("metadata", {}).get("column_names", [])
+        if operation == 'count' and known_columns:
+            return {"columns": known_columns[:1]}
+        if operation in ('average', 'sum', 'max', 'min', 'count_by'):
+            needed = list(plan.columns + plan.group_by)
+            # Unknown columns fall back to a full load so the operation reports them
+            if all(column in known_columns for column in needed):
+                return {"columns": list(dict.fromkeys(needed))}
         
-        elif self._matches_pattern(query, 'scatter_plot'):
-            match = self._extract_match(query, 'scatter_plot')
-            if match:
-                x_column, y_column = match.group(1), match.group(2)
-                return self._create_scatter_plot(df, x_column, y_column)
+        if plan.predicates:
+            # Filters return every column; row groups that cannot match are skipped when read from disk
+            return {"predicates": plan.predicates}
         
-        else:
+        # Sorts, describe and show all return every column and row
+        return {}
+    
+    def _match_and_execute_query(self, query: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Parse a query and execute the resulting plan"""
+        return self._execute_parsed_query(self._parse_query(query), query, df)
+    
+    def _parse_query(self, query: str) -> Optional[QueryPlan]:
+        """Plan for a normalized query, from the plan cache when its template was parsed before"""
+        return self.plan_cache.get_or_parse(query, self.parser.parse)
+    
+    def _execute_parsed_query(self, plan: Optional[QueryPlan], query: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Execute the plan produced by _parse_query"""
+        if plan is None:
             return {
                 "type": "error",
                 "message": f"Sorry, I don't understand the query: '{query}'. Try queries like 'show all data', 'count records', or 'average sales by region'."
             }
-    
-    def _matches_pattern(self, query: str, pattern_key: str) -> bool:
-        """Check if query matches any pattern for the given key"""
-        patterns = self.query_patterns.get(pattern_key, [])
-        return any(re.search(pattern, query) for pattern in patterns)
-    
-    def _extract_match(self, query: str, pattern_key: str):
-        """Extract match object for the first matching pattern"""
-        patterns = self.query_patterns.get(pattern_key, [])
-        for pattern in patterns:
-            match = re.search(pattern, query)
-            if match:
-                return match
-        return None
+        
+        predicate = plan.predicates[0] if plan.predicates else None
+        bounds = [condition.value for condition in plan.predicates]
+        handlers = {
+            'show_all': lambda: self._show_all(df),
+            'show_first': lambda: self._show_first_n(df, plan.limit),
+            'show_last': lambda: self._show_last_n(df, plan.limit),
+            'count': lambda: self._count_records(df),
+            'columns': lambda: self._show_columns(df),
+            'describe': lambda: self._describe_data(df),
+            'filter_greater': lambda: self._filter_greater_than(df, predicate.column, predicate.value),
+            'filter_less': lambda: self._filter_less_than(df, predicate.column, predicate.value),
+            'filter_between': lambda: self._filter_between(df, predicate.column, *bounds),
+            'filter_equal': lambda: self._filter_equal(df, predicate.column, predicate.value),
+            'filter_contains': lambda: self._filter_contains(df, predicate.column, predicate.value),
+            'average': lambda: self._calculate_average(df, plan.column, plan.group_key),
+            'sum': lambda: self._calculate_sum(df, plan.column, plan.group_key),
+            'max': lambda: self._calculate_max(df, plan.column, plan.group_key),
+            'min': lambda: self._calculate_min(df, plan.column, plan.group_key),
+            'count_by': lambda: self._count_by_group(df, plan.column),
+            'sort': lambda: self._sort_by(df, plan.column, plan.descending),
+            'bar_chart': lambda: self._create_bar_chart(df, plan.column, plan.second_column),
+            'line_chart': lambda: self._create_line_chart(df, plan.column, plan.second_column),
+            'pie_chart': lambda: self._create_pie_chart(df, plan.column),
+            'scatter_plot': lambda: self._create_scatter_plot(df, plan.column, plan.second_column)
+        }
+        return handlers[plan.operation]()
     
     # Data operation methods
     def _show_all(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -306,14 +274,8 @@ class SankalpQueryEngine:
             return {"type": "error", "message": f"Column '{column}' not found"}
         
         try:
-            filtered_df = df[df[column] > value]
-            return {
-                "type": "table",
-                "data": filtered_df.to_dict('records'),
-                "columns": df.columns.tolist(),
-                "total_rows": len(filtered_df),
-                "message": f"Found {len(filtered_df)} records where {column} > {value}"
-            }
+            filtered_df = range_filter(df, (Predicate(column, '>', value),))
+            return self._filter_result(filtered_df, f"{column} > {value}")
         except Exception as e:
             return {"type": "error", "message": f"Error filtering data: {str(e)}"}
     
@@ -322,23 +284,37 @@ class SankalpQueryEngine:
             return {"type": "error", "message": f"Column '{column}' not found"}
         
         try:
-            filtered_df = df[df[column] < value]
-            return {
-                "type": "table",
-                "data": filtered_df.to_dict('records'),
-                "columns": df.columns.tolist(),
-                "total_rows": len(filtered_df),
-                "message": f"Found {len(filtered_df)} records where {column} < {value}"
-            }
+            filtered_df = range_filter(df, (Predicate(column, '<', value),))
+            return self._filter_result(filtered_df, f"{column} < {value}")
+        except Exception as e:
+            return {"type": "error", "message": f"Error filtering data: {str(e)}"}
+    
+    def _filter_between(self, df: pd.DataFrame, column: str, low: float, high: float) -> Dict[str, Any]:
+        if column not in df.columns:
+            return {"type": "error", "message": f"Column '{column}' not found"}
+        
+        try:
+            filtered_df = range_filter(df, (Predicate(column, '>=', low), Predicate(column, '<=', high)))
+            return self._filter_result(filtered_df, f"{column} between {low} and {high}")
         except Exception as e:
             return {"type": "error", "message": f"Error filtering data: {str(e)}"}
     
+    def _filter_result(self, filtered_df: pd.DataFrame, condition: str) -> Dict[str, Any]:
+        """Table result of a filter, the filtered frame keeps every column of the dataset"""
+        return {
+            "type": "table",
+            "data": filtered_df.to_dict('records'),
+            "columns": filtered_df.columns.tolist(),
+            "total_rows": len(filtered_df),
+            "message": f"Found {len(filtered_df)} records where {condition}"
+        }
+    
     def _filter_equal(self, df: pd.DataFrame, column: str, value: str) -> Dict[str, Any]:
         if column not in df.columns:
             return {"type": "error", "message": f"Column '{column}' not found"}
         
         try:
-            filtered_df = df[df[column].astype(str).str.lower() == value.lower()]
+            filtered_df = df[equals_ignore_case_mask(df[column], value)]
             return {
                 "type": "table",
                 "data": filtered_df.to_dict('records'),
@@ -374,7 +350,7 @@ class SankalpQueryEngine:
                 if group_by not in df.columns:
                     return {"type": "error", "message": f"Group by column '{group_by}' not found"}
                 
-                result = df.groupby(group_by)[column].mean().to_dict()
+                result = df.groupby(group_by, observed=True)[column].mean().to_dict()
                 return {
                     "type": "grouped_metric",
                     "data": result,
@@ -403,7 +379,7 @@ class SankalpQueryEngine:
                 if group_by not in df.columns:
                     return {"type": "error", "message": f"Group by column '{group_by}' not found"}
                 
-                result = df.groupby(group_by)[column].sum().to_dict()
+                result = df.groupby(group_by, observed=True)[column].sum().to_dict()
                 return {
                     "type": "grouped_metric",
                     "data": result,
@@ -432,7 +408,7 @@ class SankalpQueryEngine:
                 if group_by not in df.columns:
                     return {"type": "error", "message": f"Group by column '{group_by}' not found"}
                 
-                result = df.groupby(group_by)[column].max().to_dict()
+                result = df.groupby(group_by, observed=True)[column].max().to_dict()
                 return {
                     "type": "grouped_metric",
                     "data": result,
@@ -461,7 +437,7 @@ class SankalpQueryEngine:
                 if group_by not in df.columns:
                     return {"type": "error", "message": f"Group by column '{group_by}' not found"}
                 
-                result = df.groupby(group_by)[column].min().to_dict()
+                result = df.groupby(group_by, observed=True)[column].min().to_dict()
                 return {
                     "type": "grouped_metric",
                     "data": result,
@@ -486,16 +462,34 @@ class SankalpQueryEngine:
             return {"type": "error", "message": f"Column '{column}' not found"}
         
         try:
-            result = df[column].value_counts().to_dict()
+            return self._grouped_count_result(count_values(df[column]), column)
+        except Exception as e:
+            return {"type": "error", "message": f"Error counting by group: {str(e)}"}
+    
+    def _grouped_count_result(self, counts: pd.Series, column: str) -> Dict[str, Any]:
+        return {
+            "type": "grouped_metric",
+            "data": counts.to_dict(),
+            "operation": "count",
+            "column": column,
+            "message": f"Count by {column}"
+        }
+    
+    def _sort_by(self, df: pd.DataFrame, column: str, descending: bool = False) -> Dict[str, Any]:
+        if column not in df.columns:
+            return {"type": "error", "message": f"Column '{column}' not found"}
+        
+        try:
+            sorted_df = df.sort_values(column, ascending=not descending, kind='stable')
             return {
-                "type": "grouped_metric",
-                "data": result,
-                "operation": "count",
-                "column": column,
-                "message": f"Count by {column}"
+                "type": "table",
+                "data": sorted_df.to_dict('records'),
+                "columns": df.columns.tolist(),
+                "total_rows": len(sorted_df),
+                "message": f"Sorted {len(sorted_df)} records by {column} " + ("descending" if descending else "ascending")
             }
         except Exception as e:
-            return {"type": "error", "message": f"Error counting by group: {str(e)}"}
+            return {"type": "error", "message": f"Error sorting data: {str(e)}"}
     
     def _create_bar_chart(self, df: pd.DataFrame, y_column: str, x_column: str = None) -> Dict[str, Any]:
         return {
@@ -563,6 +557,7 @@ class SankalpQueryEngine:
                 "queries": [
                     {"query": "where age greater than 25", "description": "Filter records where age > 25"},
                     {"query": "where price less than 100", "description": "Filter records where price < 100"},
+                    {"query": "where price between 10 and 100", "description": "Filter records where 10 <= price <= 100"},
                     {"query": "where city equals New York", "description": "Filter records where city = 'New York'"},
                     {"query": "where name contains john", "description": "Filter records where name contains 'john'"},
                     {"query": "filter status equal to active", "description": "Filter records where status = 'active'"}
@@ -578,6 +573,13 @@ class SankalpQueryEngine:
                     {"query": "count records by department", "description": "Count records grouped by department"}
                 ]
             },
+            {
+                "category": "Data Sorting",
+                "queries": [
+                    {"query": "sort by age", "description": "Sort records by age, smallest first"},
+                    {"query": "order by salary descending", "description": "Sort records by salary, largest first"}
+                ]
+            },
             {
                 "category": "Data Visualization",
                 "queries": [
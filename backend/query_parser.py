@@ -0,0 +1,520 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Signed numbers, words (column names may be dotted, as flattened JSON columns are), comparison symbols and
+# stray signs, which are kept so that a number they are detached from is not read as positive
+TOKEN = re.compile(r'(?<![\w.])[-+]\d+(?:\.\d+)?(?!\w)|\w+(?:\.\w+)*|[<>=+-]')
+NUMBER = re.compile(r'[-+]?\d+(?:\.\d+)?')
+# Text operand of equals/contains: the rest of the query up to a closing quote
+TEXT_VALUE = re.compile(r'\s*["\']?([^"\']+)')
+# Whitespace outside quoted literals is collapsed when normalising a query
+SPACING = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+# Quoted literals and numbers, which become parameters of a cached plan
+LITERAL = re.compile(r'"([^"]*)"|\'([^\']*)\'|((?:(?<![\w.])[-+])?\b\d+(?:\.\d+)?)\b')
+PLACEHOLDER = '\0'
+
+SYMBOLS = ('<', '>', '=', '+', '-')
+# Predicate operators comparing numbers; between becomes an inclusive '>=' and '<=' pair
+RANGE_OPS = ('>', '<', '>=', '<=')
+# Words that introduce a clause and so can never be the column they precede
+CLAUSE_WORDS = ('where', 'filter', 'is', 'by', 'of')
+# Aggregation keyword -> operation
+AGGREGATE_KEYWORDS = {
+    'average': 'average', 'mean': 'average', 'avg': 'average',
+    'sum': 'sum', 'total': 'sum',
+    'maximum': 'max', 'max': 'max', 'highest': 'max',
+    'minimum': 'min', 'min': 'min', 'lowest': 'min'
+}
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """One row condition: column, operator ('>', '<', '>=', '<=', '=' or 'contains') and operand"""
+    column: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    Typed result of parsing a query. `columns` are the columns the operation
+    reads (charts list theirs in y, x order, scatter plots in x, y order),
+    `limit` is the row count of show first/last.
+    """
+    operation: str
+    columns: Tuple[str, ...] = ()
+    predicates: Tuple[Predicate, ...] = ()
+    group_by: Tuple[str, ...] = ()
+    limit: Optional[int] = None
+    descending: bool = False
+
+    @property
+    def column(self) -> Optional[str]:
+        return self.columns[0] if self.columns else None
+
+    @property
+    def second_column(self) -> Optional[str]:
+        return self.columns[1] if len(self.columns) > 1 else None
+
+    @property
+    def group_key(self) -> Optional[str]:
+        return self.group_by[0] if self.group_by else None
+
+
+class _Tokens:
+    """Tokens of one query with their character offsets"""
+
+    def __init__(self, query: str):
+        self.query = query
+        matches = list(TOKEN.finditer(query))
+        self.words = [match.group() for match in matches]
+        self.starts = [match.start() for match in matches]
+        self.ends = [match.end() for match in matches]
+
+    def word(self, i: int) -> Optional[str]:
+        return self.words[i] if 0 <= i < len(self.words) else None
+
+    def skip(self, i: int, *optional: str) -> int:
+        """Index after an optional word at i"""
+        return i + 1 if self.word(i) in optional else i
+
+    def column(self, i: int) -> Optional[str]:
+        word = self.word(i)
+        if word is None or word in SYMBOLS or word in CLAUSE_WORDS:
+            return None
+        return word
+
+    def number(self, i: int) -> Optional[str]:
+        word = self.word(i)
+        return word if word is not None and NUMBER.fullmatch(word) else None
+
+    def index_at(self, offset: int) -> int:
+        """Index of the first token starting at or after a character offset"""
+        return bisect_left(self.starts, offset)
+
+
+# A rule looks at the token that triggered it and returns (plan, first token, end token) or None
+Match = Tuple[QueryPlan, int, int]
+Rule = Callable[[_Tokens, int], Optional[Match]]
+
+
+class QueryParser:
+    """
+    Single-pass parser for Sankalp DBMS queries.
+    The query is tokenised once; every token is looked up in a keyword table
+    and only the rules registered for that keyword run, so dispatch cost does
+    not grow with the number of query forms. When several rules match, the
+    one covering the most tokens wins (earliest first on ties), which makes
+    'count records by city' a grouped count rather than a plain count.
+    """
+
+    def __init__(self):
+        self._rules: Dict[str, List[Rule]] = {}
+        for keyword in ('show', 'display'):
+            self._register(keyword, _show)
+        self._register('select', _select_all)
+        self._register('count', _count)
+        self._register('how', _how_many)
+        self._register('group', _group_count)
+        self._register('what', _what_columns)
+        self._register('list', _list_columns)
+        self._register('describe', _describe)
+        self._register('summary', _summary)
+        self._register('data', _data_info)
+        for keyword in ('>', 'greater', '<', 'less', '=', 'equal', 'equals', 'contains', 'containing'):
+            self._register(keyword, _filter)
+        self._register('between', _between)
+        for keyword in AGGREGATE_KEYWORDS:
+            self._register(keyword, _aggregate)
+        for keyword in ('sort', 'order'):
+            self._register(keyword, _sort)
+        for keyword in ('bar', 'line'):
+            self._register(keyword, _axis_chart)
+        self._register('pie', _pie_chart)
+        self._register('scatter', _scatter_plot)
+
+    def _register(self, keyword: str, rule: Rule):
+        self._rules.setdefault(keyword, []).append(rule)
+
+    def parse(self, query: str) -> Optional[QueryPlan]:
+        """Plan for a lower-cased query, or None if it is not understood"""
+        tokens = _Tokens(query)
+        best: Optional[Match] = None
+        for i, word in enumerate(tokens.words):
+            for rule in self._rules.get(word, ()):
+                match = rule(tokens, i)
+                if match and (best is None or _more_specific(match, best)):
+                    best = match
+        return best[0] if best else None
+
+
+def _more_specific(match: Match, best: Match) -> bool:
+    _, start, end = match
+    _, best_start, best_end = best
+    return (end - start, -start) > (best_end - best_start, -best_start)
+
+
+def _show(tokens: _Tokens, i: int) -> Optional[Match]:
+    # show [me] all [data|records] | display [all] data|records | show [first|top|last|bottom] N | show columns
+    verb = tokens.word(i)
+    j = tokens.skip(i + 1, 'me') if verb == 'show' else i + 1
+    word = tokens.word(j)
+    if word == 'all':
+        return QueryPlan('show_all'), i, tokens.skip(j + 1, 'data', 'records')
+    if verb == 'display' and word in ('data', 'records'):
+        return QueryPlan('show_all'), i, j + 1
+    if verb == 'show' and word in ('column', 'columns'):
+        return QueryPlan('columns'), i, j + 1
+    operation = 'show_last' if word in ('last', 'bottom') else 'show_first'
+    if word in ('first', 'top', 'last', 'bottom'):
+        j += 1
+    n = tokens.number(j)
+    if n is None or n.startswith('-'):
+        return None
+    return QueryPlan(operation, limit=int(float(n))), i, j + 1
+
+
+def _select_all(tokens: _Tokens, i: int) -> Optional[Match]:
+    if tokens.word(i + 1) == 'all':
+        return QueryPlan('show_all'), i, i + 2
+    return None
+
+
+def _count(tokens: _Tokens, i: int) -> Optional[Match]:
+    # count [records|rows] by COL | count COL by category|group | count [total] records|rows
+    j = tokens.skip(i + 1, 'records', 'rows')
+    if tokens.word(j) == 'by' and tokens.column(j + 1):
+        return QueryPlan('count_by', columns=(tokens.column(j + 1),)), i, j + 2
+    column = tokens.column(i + 1)
+    if column and tokens.word(i + 2) == 'by' and tokens.word(i + 3) in ('category', 'group'):
+        return QueryPlan('count_by', columns=(column,)), i, i + 4
+    j = tokens.skip(i + 1, 'total')
+    if tokens.word(j) in ('records', 'rows'):
+        return QueryPlan('count'), i, j + 1
+    return None
+
+
+def _how_many(tokens: _Tokens, i: int) -> Optional[Match]:
+    if tokens.word(i + 1) == 'many' and tokens.word(i + 2) in ('records', 'rows'):
+        return QueryPlan('count'), i, i + 3
+    return None
+
+
+def _group_count(tokens: _Tokens, i: int) -> Optional[Match]:
+    # group by COL and count
+    column = tokens.column(i + 2)
+    if tokens.word(i + 1) == 'by' and column and tokens.word(i + 3) == 'and' and tokens.word(i + 4) == 'count':
+        return QueryPlan('count_by', columns=(column,)), i, i + 5
+    return None
+
+
+def _what_columns(tokens: _Tokens, i: int) -> Optional[Match]:
+    j = tokens.skip(tokens.skip(i + 1, 'are'), 'the')
+    if tokens.word(j) in ('column', 'columns'):
+        return QueryPlan('columns'), i, j + 1
+    return None
+
+
+def _list_columns(tokens: _Tokens, i: int) -> Optional[Match]:
+    if tokens.word(i + 1) in ('column', 'columns'):
+        return QueryPlan('columns'), i, i + 2
+    return None
+
+
+def _describe(tokens: _Tokens, i: int) -> Optional[Match]:
+    j = tokens.skip(i + 1, 'the')
+    if tokens.word(j) == 'data':
+        return QueryPlan('describe'), i, j + 1
+    return None
+
+
+def _summary(tokens: _Tokens, i: int) -> Optional[Match]:
+    if tokens.word(i + 1) == 'of' and tokens.word(i + 2) == 'data':
+        return QueryPlan('describe'), i, i + 3
+    return None
+
+
+def _data_info(tokens: _Tokens, i: int) -> Optional[Match]:
+    if tokens.word(i + 1) == 'info':
+        return QueryPlan('describe'), i, i + 2
+    return None
+
+
+def _filter(tokens: _Tokens, i: int) -> Optional[Match]:
+    # [where|filter] COL [is] OPERATOR VALUE, triggered by the operator
+    keyword = tokens.word(i)
+    if keyword in ('>', 'greater'):
+        operation, op = 'filter_greater', '>'
+    elif keyword in ('<', 'less'):
+        operation, op = 'filter_less', '<'
+    elif keyword in ('=', 'equal', 'equals'):
+        operation, op = 'filter_equal', '='
+    else:
+        operation, op = 'filter_contains', 'contains'
+
+    start = i - 1 if tokens.word(i - 1) == 'is' else i
+    column = tokens.column(start - 1)
+    if column is None:
+        return None
+    start = start - 2 if tokens.word(start - 2) in ('where', 'filter') else start - 1
+
+    j = i + 1
+    if keyword in ('greater', 'less'):
+        if tokens.word(j) != 'than':
+            return None
+        j += 1
+    elif keyword == 'equal':
+        j = tokens.skip(j, 'to')
+
+    if op in ('>', '<'):
+        number = tokens.number(j)
+        if number is None:
+            return None
+        value, end = float(number), j + 1
+    else:
+        offset = tokens.ends[j - 1]
+        text = TEXT_VALUE.match(tokens.query, offset)
+        if text is None:
+            return None
+        value, end = text.group(1), tokens.index_at(text.end(1))
+    return QueryPlan(operation, columns=(column,), predicates=(Predicate(column, op, value),)), start, end
+
+
+def _between(tokens: _Tokens, i: int) -> Optional[Match]:
+    # [where|filter] COL [is] between LOW and HIGH, both bounds inclusive
+    start = i - 1 if tokens.word(i - 1) == 'is' else i
+    column = tokens.column(start - 1)
+    low, high = tokens.number(i + 1), tokens.number(i + 3)
+    if column is None or low is None or high is None or tokens.word(i + 2) != 'and':
+        return None
+    start = start - 2 if tokens.word(start - 2) in ('where', 'filter') else start - 1
+    return QueryPlan('filter_between', columns=(column,),
+                     predicates=_between_predicates(column, float(low), float(high))), start, i + 4
+
+
+def _between_predicates(column: str, low: float, high: float) -> Tuple[Predicate, Predicate]:
+    """Inclusive range predicates; 'between 10 and 1' means the same range as 'between 1 and 10'"""
+    low, high = min(low, high), max(low, high)
+    return Predicate(column, '>=', low), Predicate(column, '<=', high)
+
+
+def describe_condition(predicates: Tuple[Predicate, ...]) -> str:
+    """Filter predicates as result messages show them, e.g. 'age > 25.0' or 'price between 10.0 and 20.0'"""
+    if len(predicates) == 2 and [predicate.op for predicate in predicates] == ['>=', '<=']:
+        low, high = predicates
+        return f"{low.column} between {low.value} and {high.value}"
+    return ' and '.join(
+        f"{predicate.column} contains '{predicate.value}'" if predicate.op == 'contains'
+        else f"{predicate.column} {predicate.op} {predicate.value}"
+        for predicate in predicates
+    )
+
+
+def _aggregate(tokens: _Tokens, i: int) -> Optional[Match]:
+    # [calculate|find] AGGREGATE [of] COL [by COL]
+    j = tokens.skip(i + 1, 'of')
+    column = tokens.column(j)
+    if column is None:
+        return None
+    start = i - 1 if tokens.word(i - 1) in ('calculate', 'find') else i
+    group_by = tokens.column(j + 2) if tokens.word(j + 1) == 'by' else None
+    plan = QueryPlan(AGGREGATE_KEYWORDS[tokens.word(i)], columns=(column,), group_by=(group_by,) if group_by else ())
+    return plan, start, j + 3 if group_by else j + 1
+
+
+def _sort(tokens: _Tokens, i: int) -> Optional[Match]:
+    # sort|order by COL [asc|ascending|desc|descending]
+    column = tokens.column(i + 2)
+    if tokens.word(i + 1) != 'by' or column is None:
+        return None
+    direction = tokens.word(i + 3)
+    descending = direction in ('desc', 'descending')
+    end = i + 4 if descending or direction in ('asc', 'ascending') else i + 3
+    return QueryPlan('sort', columns=(column,), descending=descending), i, end
+
+
+def _axis_chart(tokens: _Tokens, i: int) -> Optional[Match]:
+    # [create|show|make] bar|line chart|graph [of] Y [by X]
+    if tokens.word(i + 1) not in ('chart', 'graph'):
+        return None
+    j = tokens.skip(i + 2, 'of')
+    y_column = tokens.column(j)
+    if y_column is None:
+        return None
+    start = i - 1 if tokens.word(i - 1) in ('create', 'show', 'make') else i
+    x_column = tokens.column(j + 2) if tokens.word(j + 1) == 'by' else None
+    operation = 'bar_chart' if tokens.word(i) == 'bar' else 'line_chart'
+    columns = (y_column, x_column) if x_column else (y_column,)
+    return QueryPlan(operation, columns=columns), start, j + 3 if x_column else j + 1
+
+
+def _pie_chart(tokens: _Tokens, i: int) -> Optional[Match]:
+    # [create|show|make] pie chart|graph [of] COL
+    if tokens.word(i + 1) not in ('chart', 'graph'):
+        return None
+    j = tokens.skip(i + 2, 'of')
+    column = tokens.column(j)
+    if column is None:
+        return None
+    start = i - 1 if tokens.word(i - 1) in ('create', 'show', 'make') else i
+    return QueryPlan('pie_chart', columns=(column,)), start, j + 1
+
+
+def _scatter_plot(tokens: _Tokens, i: int) -> Optional[Match]:
+    # [create|show|make] scatter plot|chart [of] X vs|versus|against Y
+    if tokens.word(i + 1) not in ('plot', 'chart'):
+        return None
+    j = tokens.skip(i + 2, 'of')
+    x_column, y_column = tokens.column(j), tokens.column(j + 2)
+    if x_column is None or y_column is None or tokens.word(j + 1) not in ('vs', 'versus', 'against'):
+        return None
+    start = i - 1 if tokens.word(i - 1) in ('create', 'show', 'make') else i
+    return QueryPlan('scatter_plot', columns=(x_column, y_column)), start, j + 3
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cased query with whitespace outside quoted literals collapsed to single spaces"""
+    return SPACING.sub(lambda match: match.group(1) or ' ', query.lower()).strip()
+
+
+def parameterize(query: str) -> Tuple[str, Tuple[str, ...]]:
+    """Split a normalized query into a template, with quoted literals and numbers as placeholders, and their values"""
+    params = tuple(double or single or number for double, single, number in LITERAL.findall(query))
+    return LITERAL.sub(PLACEHOLDER, query), params
+
+
+class PlanCache:
+    """
+    LRU cache of parsed query plans keyed by query template, so queries that
+    differ only in case, spacing, numbers or quoted values are parsed once.
+    Each entry remembers which parameter fills the plan's limit and predicate
+    operands; a plan is only cached when every parameter lands in one of
+    those slots, so a literal that is part of a column name never gets reused.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[QueryPlan, Optional[int], Tuple[Optional[int], ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+
+    def configure(self, max_entries: int):
+        """Change the entry budget, evicting entries if it shrank"""
+        with self._lock:
+            self.max_entries = max_entries
+            self._evict()
+
+    def get_or_parse(self, query: str, parse: Callable[[str], Optional[QueryPlan]]) -> Optional[QueryPlan]:
+        """Plan for a normalized query from the cache, or from `parse` on a miss"""
+        template, params = parameterize(query)
+        with self._lock:
+            entry = self._entries.get(template)
+            if entry is not None:
+                self._entries.move_to_end(template)
+        plan = _bind(entry, params) if entry is not None else None
+        with self._lock:
+            if plan is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if plan is not None:
+            return plan
+
+        # A miss, or a parameter the parser would not accept in that slot
+        plan = parse(query)
+        entry = _template_entry(plan, params) if plan is not None else None
+        with self._lock:
+            if entry is None:
+                self.uncacheable += 1
+            elif self.max_entries > 0:
+                self._entries[template] = entry
+                self._entries.move_to_end(template)
+                self._evict()
+        return plan
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "uncacheable": self.uncacheable,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
+
+    def _evict(self):
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+def _limit(text: str) -> Optional[int]:
+    """A parameter converted the way the parser converts a row count, None when it would reject it"""
+    if not NUMBER.fullmatch(text) or text.startswith('-'):
+        return None
+    return int(float(text))
+
+
+def _operand(op: str, text: str) -> Any:
+    """A parameter converted the way the parser converts a predicate operand, None when it would reject it"""
+    if op not in RANGE_OPS:
+        return text
+    return float(text) if NUMBER.fullmatch(text) else None
+
+
+def _slot(value: Any, params: Tuple[str, ...], convert: Callable[[str], Any]) -> List[int]:
+    """Indexes of the parameters that produce this plan value"""
+    found = []
+    for i, param in enumerate(params):
+        converted = convert(param)
+        if converted is not None and converted == value:
+            found.append(i)
+    return found
+
+
+def _template_entry(plan: QueryPlan, params: Tuple[str, ...]):
+    """(plan, limit parameter, operand parameters), or None when the parameters do not map one-to-one onto slots"""
+    slots = [_slot(plan.limit, params, _limit)] if plan.limit is not None else [[]]
+    slots += [_slot(predicate.value, params, lambda text, op=predicate.op: _operand(op, text))
+              for predicate in plan.predicates]
+    if any(len(found) > 1 for found in slots):
+        return None
+    used = [found[0] if found else None for found in slots]
+    if sorted(i for i in used if i is not None) != list(range(len(params))):
+        return None
+    return plan, used[0], tuple(used[1:])
+
+
+def _bind(entry, params: Tuple[str, ...]) -> Optional[QueryPlan]:
+    """The cached plan with these parameters, or None when the parser would not accept one of them"""
+    plan, limit_slot, operand_slots = entry
+    if limit_slot is None and all(slot is None for slot in operand_slots):
+        return plan
+    limit = _limit(params[limit_slot]) if limit_slot is not None else plan.limit
+    if limit is None and plan.limit is not None:
+        return None
+    predicates = tuple(
+        predicate if slot is None else Predicate(predicate.column, predicate.op, _operand(predicate.op, params[slot]))
+        for predicate, slot in zip(plan.predicates, operand_slots)
+    )
+    if any(predicate.value is None for predicate in predicates):
+        return None
+    if plan.operation == 'filter_between':
+        # The template's first bound may have been the larger one
+        predicates = _between_predicates(plan.column, predicates[0].value, predicates[1].value)
+    return QueryPlan(plan.operation, plan.columns, predicates, plan.group_by, limit, plan.descending)
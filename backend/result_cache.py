@@ -0,0 +1,106 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+
+class ResultCache:
+    """
+    Shared cache of query results for Sankalp DBMS.
+    Entries are keyed by dataset content key + file version + query plan and
+    hold only the result payload's encoded JSON bytes, so a repeated query is
+    answered without executing or serialising it again and the byte budget
+    is what the cache really holds.
+    Storing a new version of a dataset drops the results of older versions;
+    entries are evicted least recently used first once their encoded size
+    exceeds the byte budget.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Hashable, Hashable], bytes]" = OrderedDict()
+        self._keys_by_content: Dict[str, Set[Tuple[str, Hashable, Hashable]]] = {}
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def configure(self, max_bytes: int):
+        """Change the byte budget, evicting entries if it shrank"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def get(self, content_key: str, version: Hashable, plan: Hashable) -> Optional[bytes]:
+        """Return the encoded payload for this query on this dataset version, or None"""
+        key = (content_key, version, plan)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, content_key: str, version: Hashable, plan: Hashable, encoded: bytes):
+        """Store a result, dropping results computed on other versions of the same content"""
+        key = (content_key, version, plan)
+        with self._lock:
+            stale = [other for other in self._keys_by_content.get(content_key, ()) if other[1] != version or other == key]
+            for other in stale:
+                self._remove(other)
+            if len(encoded) > self.max_bytes:
+                return
+            self._entries[key] = encoded
+            self._keys_by_content.setdefault(content_key, set()).add(key)
+            self._current_bytes += len(encoded)
+            self._evict()
+
+    def invalidate(self, content_key: str):
+        """Drop every cached result of a dataset's content"""
+        with self._lock:
+            keys = list(self._keys_by_content.get(content_key, ()))
+            for key in keys:
+                self._remove(key)
+            if keys:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_content.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0
+            }
+
+    def _remove(self, key: Tuple[str, Hashable, Hashable]):
+        encoded = self._entries.pop(key)
+        self._current_bytes -= len(encoded)
+        keys = self._keys_by_content[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_content[key[0]]
+
+    def _evict(self):
+        while self._entries and self._current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+
+# Single result cache shared by all query requests of this process
+result_cache = ResultCache(max_bytes=int(os.getenv("RESULT_CACHE_MB", "64")) * 1024 * 1024)
@@ -1,7 +1,8 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse, Response
+from fastapi.encoders import jsonable_encoder
 import os
 import json
 import pandas as pd
@@ -13,28 +14,97 @@ from dotenv import load_dotenv
 import aiofiles
 from pathlib import Path
 import shutil
+import asyncio
+import hashlib
+import time
+import atexit
+import threading
+from concurrent.futures import CancelledError
+
+from ingest_jobs import IngestJob, IngestJobManager
+from catalog_store import CatalogStore
+from streaming_profiler import StreamingProfiler
 
 # Load environment variables
 load_dotenv()
 
 # Import file_utils for safe dataframe loading
 try:
-    from file_utils import load_dataframe
+    from file_utils import load_dataframe, load_dataset, write_columnar, infer_schema, apply_schema, content_key
+    from file_utils import estimate_memory_bytes, dataset_version
+    from file_utils import excel_sheet_names, iter_excel_sheets
+    from file_utils import split_compression, compression_available, StreamDecompressor, COMPRESSIBLE_FILE_TYPES
+    from dataset_cache import dataset_cache
+    from result_cache import result_cache
+    from shared_store import shared_store
+    from indexes import index_store
 except ImportError:
     print("Warning: file_utils not found, using fallback dataframe loading")
     
-    def load_dataframe(file_path, file_type):
+    def load_dataframe(file_path, file_type, schema=None, progress=None, sheet_name=None):
         """Fallback dataframe loading function"""
         import pandas as pd
         if file_type == 'csv':
             return pd.read_csv(file_path)
         elif file_type == 'json':
             return pd.read_json(file_path)
+        elif file_type in ['jsonl', 'ndjson']:
+            return pd.read_json(file_path, lines=True)
         elif file_type in ['xlsx', 'xls']:
-            return pd.read_excel(file_path)
+            return pd.read_excel(file_path, sheet_name=sheet_name if sheet_name is not None else 0)
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
 
+    def excel_sheet_names(file_path, file_type):
+        """Fallback lists sheets through pandas"""
+        with pd.ExcelFile(file_path) as workbook:
+            return [str(name) for name in workbook.sheet_names]
+
+    def iter_excel_sheets(file_path, file_type):
+        """Fallback parses every sheet through pandas"""
+        for name, df in pd.read_excel(file_path, sheet_name=None).items():
+            yield str(name), df
+
+    COMPRESSIBLE_FILE_TYPES = ()
+
+    def split_compression(filename):
+        """Fallback does not recognise compressed uploads"""
+        return filename.split('.')[-1].lower(), None
+
+    def load_dataset(dataset):
+        """Fallback dataset loading without caching"""
+        return load_dataframe(dataset["file_path"], dataset["file_type"])
+
+    def write_columnar(df, columnar_path):
+        """Fallback without a columnar copy"""
+        return None
+
+    def infer_schema(df):
+        """Fallback keeps inferred dtypes"""
+        return {}
+
+    def apply_schema(df, schema):
+        """Fallback keeps inferred dtypes"""
+        return df
+
+    def content_key(dataset):
+        """Fallback keys content by dataset id"""
+        return dataset["id"]
+
+    def estimate_memory_bytes(dataset):
+        """Fallback estimate from the raw file size"""
+        return os.path.getsize(dataset["file_path"]) * 2
+
+    def dataset_version(dataset):
+        """Fallback versions the raw file"""
+        stat = os.stat(dataset["file_path"])
+        return (stat.st_mtime_ns, stat.st_size)
+
+    dataset_cache = None
+    result_cache = None
+    shared_store = None
+    index_store = None
+
 # Initialize FastAPI app
 app = FastAPI(title="Sankalp DBMS", version="1.0.0")
 
@@ -53,19 +123,69 @@ datasets_storage = {}
 queries_storage = []
 config_storage = {
     "max_file_size": 100,
-    "allowed_file_types": ["csv", "json", "xlsx"],
+    "allowed_file_types": ["csv", "json", "jsonl", "ndjson", "xlsx"],
     "auto_backup": True,
     "encrypt_data": False,
     "audit_logging": True,
     "multi_user_mode": True,
+    "dataset_cache_mb": int(os.getenv("DATASET_CACHE_MB", "512")),
+    "result_cache_mb": int(os.getenv("RESULT_CACHE_MB", "64")),
+    "streaming_threshold_mb": int(os.getenv("STREAMING_THRESHOLD_MB", "1024")),
+    "streaming_chunk_rows": 100000,
+    "preload_datasets": int(os.getenv("PRELOAD_DATASETS", "5")),
+    "plan_cache_entries": int(os.getenv("PLAN_CACHE_ENTRIES", "1024")),
+    # Range filters on datasets with at least this many rows build a sorted index on the column, 0 disables
+    "sorted_index_min_rows": int(os.getenv("SORTED_INDEX_MIN_ROWS", "1000000")),
+    # Equality filters on datasets with at least this many rows build a hash index on the column, 0 disables
+    "hash_index_min_rows": int(os.getenv("HASH_INDEX_MIN_ROWS", "1000000")),
+    # ...and only when the column has at most this many distinct values, 0 for no limit
+    "hash_index_max_keys": int(os.getenv("HASH_INDEX_MAX_KEYS", "100000")),
+    # Contains filters on text columns of datasets with at least this many rows build a trigram index, 0 disables
+    "trigram_index_min_rows": int(os.getenv("TRIGRAM_INDEX_MIN_ROWS", "1000000")),
+    # Equality filters and count_by on low-cardinality text columns of datasets with at least this many rows
+    # build a bitmap index, 0 disables
+    "bitmap_index_min_rows": int(os.getenv("BITMAP_INDEX_MIN_ROWS", "1000000")),
     "version": "1.0.0"
 }
 print("Using in-memory storage")
 
+def apply_cache_config():
+    """Push the configured cache budgets into the shared dataset and result caches"""
+    if dataset_cache:
+        dataset_cache.configure(int(config_storage["dataset_cache_mb"]) * 1024 * 1024)
+    if result_cache:
+        result_cache.configure(int(config_storage["result_cache_mb"]) * 1024 * 1024)
+
+apply_cache_config()
+
 # Upload directory
 UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Background ingest of uploads
+ingest_jobs = IngestJobManager(max_workers=int(os.getenv("INGEST_WORKERS", "2")))
+
+# Catalog and query history survive restarts; the files they point to live in UPLOAD_DIR
+MAX_PERSISTED_QUERIES = 1000
+PERSISTED_QUERY_FIELDS = ("id", "query", "dataset_id", "dataset_name", "timestamp", "execution_time")
+
+def persisted_query(query_record: Dict) -> Dict:
+    """History entry as persisted: what was asked and how it went, without the result rows"""
+    record = {field: query_record.get(field) for field in PERSISTED_QUERY_FIELDS}
+    result = query_record.get("result")
+    record["success"] = result.get("success", False) if isinstance(result, dict) else query_record.get("success", False)
+    return record
+
+catalog = CatalogStore(
+    UPLOAD_DIR / "catalog.json",
+    lambda: {"datasets": dict(datasets_storage),
+             "queries": [persisted_query(record) for record in queries_storage[-MAX_PERSISTED_QUERIES:]]}
+)
+atexit.register(catalog.flush)
+
+# Startup progress reported by the readiness probe
+startup_state = {"catalog_restored": False, "cache_warm": False}
+
 # Security
 security = HTTPBearer(auto_error=False)
 MULTI_USER_MODE = os.getenv("MULTI_USER_MODE", "true").lower() == "true"
@@ -76,7 +196,7 @@ try:
     from visualization_engine import VisualizationEngine
     
     # Initialize engines
-    query_engine = SankalpQueryEngine()
+    query_engine = SankalpQueryEngine(config_storage)
     viz_engine = VisualizationEngine()
     print("Query and visualization engines initialized")
 except ImportError as e:
@@ -88,14 +208,44 @@ except ImportError as e:
 async def root():
     return {"message": "Welcome to Sankalp DBMS - Your Natural Language Database"}
 
+def readiness() -> Dict[str, Any]:
+    """Whether this worker should receive traffic, with the check that is holding it back"""
+    checks = {
+        "catalog_restored": startup_state["catalog_restored"],
+        "cache_warm": startup_state["cache_warm"],
+        "query_engine": query_engine is not None,
+        "visualization_engine": viz_engine is not None,
+        "upload_dir_writable": os.access(UPLOAD_DIR, os.W_OK)
+    }
+    return {"ready": all(checks.values()), "checks": checks}
+
+@app.get("/api/health/live")
+async def liveness_check():
+    """Liveness: the process is up and serving requests, nothing else is checked"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/api/health/ready")
+async def readiness_check():
+    """Readiness: catalog restored, most used datasets preloaded and engines available"""
+    result = readiness()
+    result["timestamp"] = datetime.now().isoformat()
+    return JSONResponse(status_code=200 if result["ready"] else 503, content=result)
+
 @app.get("/api/health")
 async def health_check():
     return {
         "status": "healthy", 
+        "ready": readiness()["ready"],
         "timestamp": datetime.now().isoformat(),
         "database": "in-memory",
         "query_engine": query_engine is not None,
-        "visualization_engine": viz_engine is not None
+        "visualization_engine": viz_engine is not None,
+        "dataset_cache": dataset_cache.stats() if dataset_cache else None,
+        "plan_cache": query_engine.plan_cache.stats() if query_engine else None,
+        "result_cache": result_cache.stats() if result_cache else None,
+        "shared_store": shared_store.stats() if shared_store else None,
+        "indexes": index_store.stats() if index_store else None,
+        "catalog": catalog.stats()
     }
 
 @app.get("/api/config")
@@ -105,6 +255,9 @@ async def get_config():
 @app.post("/api/config")
 async def update_config(config: Dict[str, Any]):
     config_storage.update(config)
+    apply_cache_config()
+    if query_engine:
+        query_engine.plan_cache.configure(int(config_storage["plan_cache_entries"]))
     return {"success": True}
 
 @app.post("/api/upload")
@@ -112,117 +265,440 @@ async def upload_file(file: UploadFile = File(...)):
     """
     Handle user file upload and persist to disk, then process metadata.
     """
-    ext = file.filename.split('.')[-1].lower()
+    ext, compression = split_compression(file.filename)
     if ext not in config_storage["allowed_file_types"] + ["xls"]:
         raise HTTPException(status_code=400, detail="Unsupported file type")
+    if compression and (ext not in COMPRESSIBLE_FILE_TYPES or not compression_available(compression)):
+        raise HTTPException(status_code=400, detail=f"Unsupported compression for {ext} files: {compression}")
+    # Compressed uploads are stored compressed and decompressed whenever they are read
+    stored_ext = f"{ext}.{file.filename.rsplit('.', 1)[-1].lower()}" if compression else ext
 
     dataset_id = str(uuid.uuid4())
-    save_path = UPLOAD_DIR / f"{dataset_id}.{ext}"
+    incoming_path = UPLOAD_DIR / f".incoming-{dataset_id}.{stored_ext}"
+
+    # CSV metadata is profiled in the same pass that writes the file
+    profiler = StreamingProfiler() if ext == 'csv' else None
+    decompressor = StreamDecompressor(compression) if profiler and compression else None
+    digest = hashlib.sha256()
 
-    # Save file to disk
+    # Save file to disk, hashing it for content-addressed storage
     try:
-        async with aiofiles.open(save_path, 'wb') as out_file:
+        async with aiofiles.open(incoming_path, 'wb') as out_file:
             while True:
                 content = await file.read(1024*1024)
                 if not content:
                     break
                 await out_file.write(content)
+                digest.update(content)
+                if profiler:
+                    try:
+                        if decompressor:
+                            content = await asyncio.to_thread(decompressor.decompress, content)
+                        await asyncio.to_thread(profiler.feed, content)
+                    except Exception as profile_error:
+                        # The background ingest extracts metadata from a full parse instead
+                        print(f"Streaming profile failed, falling back to full parse: {profile_error}")
+                        profiler = None
     except Exception as e:
+        if incoming_path.exists():
+            incoming_path.unlink()
         raise HTTPException(status_code=500, detail=f"Failed to save file: {e}")
 
-    # Process metadata using new safe loading
-    try:
-        metadata = await process_uploaded_file(save_path, file.filename, ext)
-    except Exception as e:
-        # Clean up if processing fails
-        if save_path.exists():
-            save_path.unlink()
-        raise HTTPException(status_code=500, detail=f"Failed to process file: {e}")
+    # Every sheet of a workbook becomes its own table
+    sheet_names = None
+    if ext in ('xlsx', 'xls'):
+        try:
+            sheet_names = await asyncio.to_thread(excel_sheet_names, incoming_path, ext)
+        except Exception as e:
+            incoming_path.unlink()
+            raise HTTPException(status_code=400, detail=f"Failed to read workbook: {e}")
+
+    # Identical bytes are stored once; no awaits below so the lookup and registration are atomic
+    content_hash = digest.hexdigest()
+    save_path = UPLOAD_DIR / f"{content_hash}.{stored_ext}"
 
     dataset_info = {
         "id": dataset_id,
         "original_name": file.filename,
         "file_path": str(save_path),
         "file_type": ext,
+        "compression": compression,
+        "content_hash": content_hash,
+        "columnar_path": None,
+        "columnar_schema": None,
         "upload_time": datetime.now().isoformat(),
-        "metadata": metadata
+        "state": "ingesting",
+        "metadata": None
     }
+    entries = [dataset_info]
+    if sheet_names:
+        entries = sheet_entries(dataset_info, sheet_names)
+        dataset_info = entries[0]
+
+    sources = [find_content(content_hash, ext, entry.get("sheet_index")) for entry in entries]
+    if sources[0] is not None or save_path.exists():
+        incoming_path.unlink()
+    else:
+        incoming_path.replace(save_path)
+
+    if all(source is not None for source in sources):
+        # Duplicate upload: point at the existing columnar copies, cached frames and indexes
+        for entry in entries:
+            datasets_storage[entry["id"]] = entry
+        source_job = ingest_job_for(sources[0])
+        if all(source.get("state", "ready") == "ready" for source in sources):
+            for entry, source in zip(entries, sources):
+                adopt_content(entry, source)
+        else:
+            ingest_jobs.submit(dataset_id, save_path.stat().st_size,
+                               lambda job: adopt_when_ingested(entries, sources, source_job))
+        catalog.mark_dirty()
+        return dataset_info
+
+    if sheet_names:
+        for entry in entries:
+            datasets_storage[entry["id"]] = entry
+        # One streaming pass over the workbook converts every sheet; no query path reads it again
+        ingest_jobs.submit(dataset_id, save_path.stat().st_size, lambda job: ingest_workbook(entries, job))
+        catalog.mark_dirty()
+        return dataset_info
+
+    metadata = None
+    if profiler:
+        try:
+            metadata = profiled_metadata(profiler, save_path)
+        except Exception as profile_error:
+            print(f"Streaming profile failed, falling back to full parse: {profile_error}")
+
+    dataset_info["metadata"] = metadata
     datasets_storage[dataset_id] = dataset_info
 
+    # Parse, extract metadata and convert in the background; poll /status until ready
+    ingest_jobs.submit(dataset_id, save_path.stat().st_size,
+                       lambda job: ingest_dataset(dataset_info, columnar_path_for(dataset_info), job))
+    catalog.mark_dirty()
+
     return dataset_info
 
-async def process_uploaded_file(file_path: Path, original_name: str, file_type: str) -> Dict:
-    """Process uploaded file and extract metadata using safe loader"""
+def sheet_entries(dataset_info: Dict, sheet_names: List[str]) -> List[Dict]:
+    """
+    Catalog entries for the sheets of a workbook. The first sheet keeps the
+    upload's id; the others get their own ids pointing back at it.
+    """
+    sheets = [{"index": i, "name": name, "dataset_id": dataset_info["id"] if i == 0 else str(uuid.uuid4())}
+              for i, name in enumerate(sheet_names)]
+    entries = []
+    for sheet in sheets:
+        entry = dict(dataset_info, id=sheet["dataset_id"], sheet_name=sheet["name"], sheet_index=sheet["index"], sheets=sheets)
+        if len(sheets) > 1:
+            entry["original_name"] = f"{dataset_info['original_name']} [{sheet['name']}]"
+        if sheet["index"]:
+            entry["parent_id"] = dataset_info["id"]
+        entries.append(entry)
+    return entries
+
+def columnar_path_for(dataset: Dict) -> Path:
+    """Where the columnar copy of a dataset's content is written"""
+    return UPLOAD_DIR / f"{content_key(dataset)}.parquet"
+
+def ingest_job_for(dataset: Dict) -> Optional[IngestJob]:
+    """Ingest job of a dataset; workbook sheets share the job of their first sheet"""
+    return ingest_jobs.get(dataset["id"]) or ingest_jobs.get(dataset.get("parent_id"))
+
+def find_content(content_hash: str, file_type: str, sheet_index: Optional[int] = None) -> Optional[Dict]:
+    """Catalog entry already holding this content, preferring one that is ready"""
+    matches = [
+        dataset for dataset in datasets_storage.values()
+        if dataset.get("content_hash") == content_hash and dataset["file_type"] == file_type
+        and dataset.get("sheet_index") == sheet_index and dataset.get("state", "ready") != "failed"
+    ]
+    ready = [dataset for dataset in matches if dataset.get("state", "ready") == "ready"]
+    return (ready or matches or [None])[0]
+
+def content_in_use(dataset: Dict) -> bool:
+    """Whether another live catalog entry still references this dataset's stored content"""
+    return any(
+        other["id"] != dataset["id"] and other.get("state") != "failed" and content_key(other) == content_key(dataset)
+        for other in datasets_storage.values()
+    )
+
+def raw_file_in_use(dataset: Dict) -> bool:
+    """Whether another live catalog entry, e.g. another sheet of a workbook, shares the uploaded file"""
+    return any(
+        other["id"] != dataset["id"] and other.get("state") != "failed" and other["file_path"] == dataset["file_path"]
+        for other in datasets_storage.values()
+    )
+
+def remove_stored_content(dataset: Dict, columnar_path: Optional[Path] = None):
+    """Delete a dataset's files and cached frames unless another catalog entry still uses them"""
+    if not raw_file_in_use(dataset) and Path(dataset["file_path"]).exists():
+        Path(dataset["file_path"]).unlink()
+    if content_in_use(dataset):
+        return
+    columnar_path = columnar_path or dataset.get("columnar_path")
+    if columnar_path and Path(columnar_path).exists():
+        Path(columnar_path).unlink()
+    if dataset_cache:
+        dataset_cache.invalidate(content_key(dataset))
+    if result_cache:
+        result_cache.invalidate(content_key(dataset))
+    if shared_store:
+        shared_store.remove(content_key(dataset))
+    if index_store:
+        index_store.remove(dataset)
+
+def adopt_content(dataset_info: Dict, source: Dict):
+    """Make a catalog entry share the ingested content of another entry"""
+    dataset_info.update({
+        "columnar_path": source.get("columnar_path"),
+        "columnar_schema": source.get("columnar_schema"),
+        "metadata": source.get("metadata"),
+        "state": "ready"
+    })
+
+def adopt_when_ingested(entries: List[Dict], sources: List[Dict], source_job: Optional[IngestJob]):
+    """Background job for a duplicate upload whose content is still being ingested"""
+    error = None
+    if source_job and source_job.future:
+        try:
+            source_job.future.result()
+        except CancelledError:
+            # The source upload was deleted before its ingest started
+            error = "The upload this file duplicates was deleted before it was processed, please upload it again"
+        except Exception as e:
+            error = str(e)
+    failed = [source for source in sources if source.get("state") != "ready"]
+    if failed or error:
+        error = (failed[0].get("error") if failed else None) or error or "Failed to process file"
+        for entry in entries:
+            entry["state"] = "failed"
+            entry["error"] = error
+        catalog.mark_dirty()
+        raise Exception(error)
+    for entry, source in zip(entries, sources):
+        adopt_content(entry, source)
+    catalog.mark_dirty()
+
+def ingest_workbook(entries: List[Dict], job: IngestJob):
+    """Background ingest of a workbook, converting each sheet to its own columnar copy"""
+    save_path = Path(entries[0]["file_path"])
+    total_bytes = save_path.stat().st_size
+    sheet_count = len(entries[0]["sheets"])
+    by_index = {entry["sheet_index"]: entry for entry in entries}
+    started = time.perf_counter()
+    rows = 0
+    try:
+        for index, (sheet_name, df) in enumerate(iter_excel_sheets(save_path, entries[0]["file_type"])):
+            # Sheets are one file, progress moves on per sheet
+            job.report(total_bytes * (index + 1) // sheet_count, rows)
+            entry = by_index.get(index)
+            if entry is None:
+                continue
+            sheet_started = time.perf_counter()
+            metadata = process_frame(df, save_path, columnar_path_for(entry))
+            rows += metadata["rows"]
+            finish_ingest(entry, metadata, columnar_path_for(entry), "openpyxl", time.perf_counter() - sheet_started)
+    except Exception as e:
+        failed = [entry for entry in entries if entry.get("state") != "ready"]
+        for entry in failed:
+            entry["state"] = "failed"
+            entry["error"] = f"Failed to process file: {e}"
+        for entry in failed:
+            remove_stored_content(entry, columnar_path_for(entry))
+        catalog.mark_dirty()
+        raise
+
+    print(f"Ingested {len(entries)} sheets of {save_path.name} in {time.perf_counter() - started:.2f}s")
+
+def ingest_dataset(dataset_info: Dict, columnar_path: Path, job: IngestJob):
+    """Background ingest of a saved upload, run on the ingest worker pool"""
+    save_path = Path(dataset_info["file_path"])
+    started = time.perf_counter()
+    try:
+        if dataset_info["metadata"]:
+            # Metadata was profiled during upload, its schema makes this a type-inference-free parse
+            metadata = dict(dataset_info["metadata"])
+            df = load_dataframe(save_path, dataset_info["file_type"], schema=metadata["column_types"], progress=job.report)
+            metadata["columnar_schema"] = write_columnar_copy(df, columnar_path)
+            metadata["parser"] = df.attrs.get("reader", "pandas")
+        else:
+            metadata = process_uploaded_file(save_path, dataset_info["original_name"], dataset_info["file_type"],
+                                             columnar_path, progress=job.report)
+        # The reader that actually parsed the file, pandas when Arrow gave up on it
+        parser = metadata.pop("parser", "pandas")
+    except Exception as e:
+        # Clean up if processing fails
+        dataset_info["state"] = "failed"
+        dataset_info["error"] = f"Failed to process file: {e}"
+        remove_stored_content(dataset_info, columnar_path)
+        catalog.mark_dirty()
+        raise
+
+    finish_ingest(dataset_info, metadata, columnar_path, parser, time.perf_counter() - started)
+
+def finish_ingest(dataset_info: Dict, metadata: Dict, columnar_path: Path, parser: str, seconds: float):
+    """Record an ingested dataset's metadata and columnar copy and mark it ready"""
+    save_path = Path(dataset_info["file_path"])
+    size_mb = save_path.stat().st_size / (1024 * 1024)
+    print(f"Ingested {dataset_info['original_name']} with {parser} parser: {size_mb:.1f} MB in {seconds:.2f}s")
+
+    columnar_schema = metadata.pop("columnar_schema", None)
+    dataset_info.update({
+        "ingest": {
+            "parser": parser,
+            "seconds": round(seconds, 3),
+            "throughput_mb_s": round(size_mb / seconds, 2) if seconds > 0 else None
+        },
+        "columnar_path": str(columnar_path) if columnar_schema is not None else None,
+        "columnar_schema": columnar_schema,
+        "metadata": metadata,
+        "state": "ready"
+    })
+
+    # Deleted while ingesting: nothing references the columnar copy any more
+    if dataset_info["id"] not in datasets_storage and not content_in_use(dataset_info) and columnar_path.exists():
+        columnar_path.unlink()
+    catalog.mark_dirty()
+
+def profiled_metadata(profiler: StreamingProfiler, file_path: Path) -> Dict:
+    """Upload metadata from the streaming profile, in the shape process_uploaded_file returns"""
+    metadata = profiler.finish(file_path.stat().st_size)
+    metadata["sample_data"] = to_json_records(metadata.pop("sample"))
+    return metadata
+
+def to_json_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows as records of JSON-safe values, missing values as empty strings"""
+    # Categoricals only accept their own categories, fill them as plain objects
+    categorical = [col for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)]
+    if categorical:
+        df = df.astype({col: object for col in categorical})
+    records = df.fillna("").to_dict('records')
+    # Convert any numpy types to native Python types
+    for record in records:
+        for key, value in record.items():
+            if pd.isna(value) or value is None:
+                record[key] = ""
+            elif isinstance(value, (np.int64, np.int32)):
+                record[key] = int(value)
+            elif isinstance(value, (np.float64, np.float32)):
+                record[key] = float(value)
+            else:
+                record[key] = str(value)
+    return records
+
+# Stands in for a cached result while its envelope is encoded, then replaced by the stored bytes
+RESULT_PLACEHOLDER = f"cached-result-{uuid.uuid4().hex}"
+
+def encode_json(content: Any) -> Optional[bytes]:
+    """Content encoded exactly as JSONResponse renders it, or None if it is not JSON-safe"""
+    try:
+        return json.dumps(
+            jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+    except (TypeError, ValueError):
+        return None
+
+def encoded_result_response(response: Dict[str, Any], encoded: bytes) -> Response:
+    """Query response whose result payload is spliced in from already encoded bytes"""
+    envelope = dict(response, result=dict(response["result"], result=RESULT_PLACEHOLDER))
+    body = encode_json(envelope).replace(json.dumps(RESULT_PLACEHOLDER).encode("utf-8"), encoded, 1)
+    return Response(content=body, media_type="application/json")
+
+def write_columnar_copy(df: pd.DataFrame, columnar_path: Optional[Path]) -> Optional[Dict]:
+    """Write the columnar copy that all later reads use; the raw file is kept for download"""
+    if columnar_path is None:
+        return None
+    try:
+        return write_columnar(df, columnar_path)
+    except Exception as columnar_error:
+        print(f"Could not write columnar copy, falling back to raw file: {columnar_error}")
+        if columnar_path.exists():
+            columnar_path.unlink()
+        return None
+
+def require_ready(dataset: Dict):
+    """Reject requests against datasets that are still ingesting or failed to ingest"""
+    state = dataset.get("state", "ready")
+    if state == "failed":
+        raise HTTPException(status_code=409, detail=dataset.get("error", "Dataset failed to ingest"))
+    if state != "ready":
+        raise HTTPException(status_code=409, detail=f"Dataset is still {state}, check /api/datasets/{dataset['id']}/status")
+
+def process_uploaded_file(file_path: Path, original_name: str, file_type: str, columnar_path: Optional[Path] = None,
+                          progress=None) -> Dict:
+    """Process uploaded file, write its columnar copy and extract metadata using safe loader"""
     try:
         print(f"Processing file: {file_path}, type: {file_type}")
 
         # Use safe loader for DataFrame
-        df = load_dataframe(file_path, file_type)
+        df = load_dataframe(file_path, file_type, progress=progress)
         print(f"File loaded successfully, shape: {df.shape}")
 
-        # Extract metadata safely
-        try:
-            column_types = {}
-            for col in df.columns:
-                try:
-                    column_types[col] = str(df[col].dtype)
-                except:
-                    column_types[col] = "object"
-
-            sample_data = []
-            try:
-                sample_data = df.head(5).fillna("").to_dict('records')
-                # Convert any numpy types to native Python types
-                for record in sample_data:
-                    for key, value in record.items():
-                        if pd.isna(value) or value is None:
-                            record[key] = ""
-                        elif isinstance(value, (np.int64, np.int32)):
-                            record[key] = int(value)
-                        elif isinstance(value, (np.float64, np.float32)):
-                            record[key] = float(value)
-                        else:
-                            record[key] = str(value)
-            except Exception as sample_error:
-                print(f"Error creating sample data: {sample_error}")
-                sample_data = []
-
-            metadata = {
-                "rows": int(len(df)),
-                "columns": int(len(df.columns)),
-                "column_names": [str(col) for col in df.columns.tolist()],
-                "column_types": column_types,
-                "sample_data": sample_data,
-                "missing_values": {str(col): int(df[col].isnull().sum()) for col in df.columns},
-                "file_size": int(file_path.stat().st_size),
-                "numeric_columns": [str(col) for col in df.select_dtypes(include=[np.number]).columns.tolist()],
-                "categorical_columns": [str(col) for col in df.select_dtypes(include=['object']).columns.tolist()],
-                "date_columns": [str(col) for col in df.select_dtypes(include=['datetime']).columns.tolist()]
-            }
-
-            print(f"Metadata extracted successfully")
-            return metadata
-
-        except Exception as metadata_error:
-            print(f"Error extracting metadata: {metadata_error}")
-            # Return basic metadata if detailed extraction fails
-            return {
-                "rows": int(len(df)),
-                "columns": int(len(df.columns)),
-                "column_names": [str(col) for col in df.columns.tolist()],
-                "column_types": {},
-                "sample_data": [],
-                "missing_values": {},
-                "file_size": int(file_path.stat().st_size),
-                "numeric_columns": [],
-                "categorical_columns": [],
-                "date_columns": []
-            }
+        metadata = process_frame(df, file_path, columnar_path)
+        metadata["parser"] = df.attrs.get("reader", "pandas")
+        return metadata
 
     except Exception as e:
         print(f"Error processing file {file_path}: {str(e)}")
         raise Exception(f"Error processing file: {str(e)}")
 
+def process_frame(df: pd.DataFrame, file_path: Path, columnar_path: Optional[Path] = None) -> Dict:
+    """Bind compact dtypes, write the columnar copy and extract metadata of a parsed table"""
+    # Fix compact dtypes once; column_types then binds every later load
+    df = apply_schema(df, infer_schema(df))
+
+    columnar_schema = write_columnar_copy(df, columnar_path)
+
+    # Extract metadata safely
+    try:
+        column_types = {}
+        for col in df.columns:
+            try:
+                column_types[col] = str(df[col].dtype)
+            except:
+                column_types[col] = "object"
+
+        sample_data = []
+        try:
+            sample_data = to_json_records(df.head(5))
+        except Exception as sample_error:
+            print(f"Error creating sample data: {sample_error}")
+            sample_data = []
+
+        metadata = {
+            "rows": int(len(df)),
+            "columns": int(len(df.columns)),
+            "column_names": [str(col) for col in df.columns.tolist()],
+            "column_types": column_types,
+            "sample_data": sample_data,
+            "missing_values": {str(col): int(df[col].isnull().sum()) for col in df.columns},
+            "file_size": int(file_path.stat().st_size),
+            "numeric_columns": [str(col) for col in df.select_dtypes(include=[np.number]).columns.tolist()],
+            "categorical_columns": [str(col) for col in df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()],
+            "date_columns": [str(col) for col in df.select_dtypes(include=['datetime']).columns.tolist()],
+            "columnar_schema": columnar_schema
+        }
+
+        print(f"Metadata extracted successfully")
+        return metadata
+
+    except Exception as metadata_error:
+        print(f"Error extracting metadata: {metadata_error}")
+        # Return basic metadata if detailed extraction fails
+        return {
+            "rows": int(len(df)),
+            "columns": int(len(df.columns)),
+            "column_names": [str(col) for col in df.columns.tolist()],
+            "column_types": {},
+            "sample_data": [],
+            "missing_values": {},
+            "file_size": int(file_path.stat().st_size),
+            "numeric_columns": [],
+            "categorical_columns": [],
+            "date_columns": [],
+            "columnar_schema": columnar_schema
+        }
+
 @app.get("/api/datasets")
 async def get_datasets():
     """Get all datasets"""
@@ -242,6 +718,26 @@ async def get_dataset(dataset_id: str):
         "dataset": datasets_storage[dataset_id]
     }
 
+@app.get("/api/datasets/{dataset_id}/status")
+async def get_dataset_status(dataset_id: str):
+    """Get ingest state and progress of a dataset"""
+    if dataset_id not in datasets_storage:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    dataset = datasets_storage[dataset_id]
+    job = ingest_job_for(dataset)
+    status = job.to_dict() if job else {}
+    status["dataset_id"] = dataset_id
+    # The catalog entry is authoritative, the job only tracks progress
+    status["state"] = dataset.get("state", "ready")
+    status["error"] = dataset.get("error")
+    status["ingest"] = dataset.get("ingest")
+    
+    return {
+        "success": True,
+        "status": status
+    }
+
 @app.delete("/api/datasets/{dataset_id}")
 async def delete_dataset(dataset_id: str):
     """Delete a dataset"""
@@ -249,17 +745,68 @@ async def delete_dataset(dataset_id: str):
         raise HTTPException(status_code=404, detail="Dataset not found")
     
     dataset = datasets_storage[dataset_id]
-    file_path = Path(dataset["file_path"])
-    
-    # Delete file from disk
-    if file_path.exists():
-        file_path.unlink()
     
     # Remove from storage
     del datasets_storage[dataset_id]
+    # Other sheets of a workbook are still converted by this upload's job
+    if not any(other.get("parent_id") == dataset_id for other in datasets_storage.values()):
+        job = ingest_jobs.get(dataset_id)
+        if job and job.future:
+            job.future.cancel()
+        ingest_jobs.forget(dataset_id)
+    
+    # Stored content is shared by identical uploads and sheets, only the last reference deletes it
+    remove_stored_content(dataset)
+    catalog.mark_dirty()
     
     return {"success": True, "message": "Dataset deleted successfully"}
 
+@app.post("/api/datasets/{dataset_id}/indexes")
+async def create_index(dataset_id: str, request: Dict[str, Any]):
+    """
+    Build an index of a column: "sorted" (numeric columns, used by range
+    filters), "hash" (any column, used by equality filters), "trigram"
+    (text columns, used by contains filters) or "bitmap" (low-cardinality
+    text columns, used by equality filters and count_by)
+    """
+    if dataset_id not in datasets_storage:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    column = request.get("column")
+    if not column:
+        raise HTTPException(status_code=400, detail="Column is required")
+    
+    index_type = request.get("type", "sorted")
+    if index_type not in ("sorted", "hash", "trigram", "bitmap"):
+        raise HTTPException(status_code=400, detail="Index type must be 'sorted', 'hash', 'trigram' or 'bitmap'")
+    
+    if not index_store:
+        raise HTTPException(status_code=503, detail="Indexes not available")
+    
+    dataset = datasets_storage[dataset_id]
+    require_ready(dataset)
+    
+    if column not in dataset.get("metadata", {}).get("column_names", []):
+        raise HTTPException(status_code=404, detail=f"Column '{column}' not found")
+    
+    index = await asyncio.to_thread(index_store.get, dataset, column, index_type, True)
+    if index is None:
+        raise HTTPException(status_code=400, detail=f"Column '{column}' cannot have a {index_type} index")
+    
+    return {
+        "success": True,
+        "index": {"column": column, "type": index_type, "indexed_rows": index.indexed_rows}
+    }
+
+@app.get("/api/datasets/{dataset_id}/download")
+async def download_dataset(dataset_id: str):
+    """Download the originally uploaded file"""
+    if dataset_id not in datasets_storage:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    dataset = datasets_storage[dataset_id]
+    return FileResponse(dataset["file_path"], filename=dataset["original_name"])
+
 @app.post("/api/query")
 async def execute_query(request: Dict[str, Any]):
     """Execute a natural language query"""
@@ -279,28 +826,53 @@ async def execute_query(request: Dict[str, Any]):
         raise HTTPException(status_code=503, detail="Query engine not available")
     
     dataset = datasets_storage[dataset_id]
+    require_ready(dataset)
     
     try:
-        # Execute query using the query engine
-        result = await query_engine.execute_query(query, dataset)
+        # Identical plans on the same dataset version reuse the stored encoded result
+        start_time = datetime.now()
+        plan = query_engine.plan_query(query)
+        cache_key = (content_key(dataset), dataset_version(dataset), plan) if result_cache and plan else None
+        encoded = result_cache.get(*cache_key) if cache_key else None
+        if encoded is not None:
+            result = {
+                "success": True,
+                "query": query,
+                # Spliced in from the encoded bytes
+                "result": None,
+                "execution_time": (datetime.now() - start_time).total_seconds(),
+                "dataset_id": dataset_id,
+                "cached": True
+            }
+        else:
+            # Execute query using the query engine
+            result = await query_engine.execute_query(query, dataset, plan)
+            result["cached"] = False
+            encoded = encode_json(result["result"]) if cache_key and result["success"] else None
+            if encoded is not None:
+                result_cache.put(*cache_key, encoded)
         
-        # Store query in history
+        # Store query in history, without the result rows
         query_record = {
             "id": str(uuid.uuid4()),
             "query": query,
             "dataset_id": dataset_id,
             "dataset_name": dataset["original_name"],
-            "result": result,
+            "success": result.get("success", False),
             "timestamp": datetime.now().isoformat(),
             "execution_time": result.get("execution_time", 0)
         }
         queries_storage.append(query_record)
+        record_usage(dataset)
         
-        return {
+        response = {
             "success": True,
             "query_id": query_record["id"],
             "result": result
         }
+        if encoded is None:
+            return response
+        return encoded_result_response(response, encoded)
         
     except Exception as e:
         return {
@@ -336,9 +908,11 @@ async def create_visualization(request: Dict[str, Any]):
         raise HTTPException(status_code=503, detail="Visualization engine not available")
     
     dataset = datasets_storage[dataset_id]
+    require_ready(dataset)
     
     try:
         result = await viz_engine.create_visualization(dataset, chart_type, config)
+        record_usage(dataset)
         return {
             "success": True,
             "visualization": result
@@ -499,23 +1073,12 @@ async def preview_dataset(dataset_id: str, limit: int = 10):
         raise HTTPException(status_code=404, detail="Dataset not found")
     
     dataset = datasets_storage[dataset_id]
+    require_ready(dataset)
     
     try:
-        df = load_dataframe(dataset["file_path"], dataset["file_type"])
+        df = load_dataset(dataset)
         
-        preview_data = df.head(limit).fillna("").to_dict('records')
-        
-        # Convert numpy types to native Python types
-        for record in preview_data:
-            for key, value in record.items():
-                if pd.isna(value) or value is None:
-                    record[key] = ""
-                elif isinstance(value, (np.int64, np.int32)):
-                    record[key] = int(value)
-                elif isinstance(value, (np.float64, np.float32)):
-                    record[key] = float(value)
-                else:
-                    record[key] = str(value)
+        preview_data = to_json_records(df.head(limit))
         
         return {
             "success": True,
@@ -538,17 +1101,18 @@ async def analyze_dataset(dataset_id: str):
         raise HTTPException(status_code=404, detail="Dataset not found")
     
     dataset = datasets_storage[dataset_id]
+    require_ready(dataset)
     
     try:
-        df = load_dataframe(dataset["file_path"], dataset["file_type"])
+        df = load_dataset(dataset)
         
         # Basic analysis
         analysis = {
             "basic_stats": {
                 "rows": len(df),
                 "columns": len(df.columns),
-                "missing_values": df.isnull().sum().sum(),
-                "duplicate_rows": df.duplicated().sum()
+                "missing_values": int(df.isnull().sum().sum()),
+                "duplicate_rows": int(df.duplicated().sum())
             },
             "column_analysis": {},
             "data_types": {str(k): str(v) for k, v in df.dtypes.to_dict().items()},
@@ -564,7 +1128,7 @@ async def analyze_dataset(dataset_id: str):
                 "null_percentage": float(df[col].isnull().sum() / len(df) * 100)
             }
             
-            if df[col].dtype in ['int64', 'float64']:
+            if pd.api.types.is_numeric_dtype(df[col].dtype) and not pd.api.types.is_bool_dtype(df[col].dtype):
                 col_analysis.update({
                     "min": float(df[col].min()),
                     "max": float(df[col].max()),
@@ -579,6 +1143,22 @@ async def analyze_dataset(dataset_id: str):
             
             analysis["column_analysis"][col] = col_analysis
         
+        # Memory saved by dictionary encoding low-cardinality text columns
+        encoded_columns = {}
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                encoded_bytes = int(df[col].memory_usage(deep=True, index=False))
+                unencoded_bytes = int(df[col].astype(object).memory_usage(deep=True, index=False))
+                encoded_columns[str(col)] = {
+                    "distinct_values": len(df[col].cat.categories),
+                    "encoded_bytes": encoded_bytes,
+                    "unencoded_bytes": unencoded_bytes
+                }
+        analysis["dictionary_encoding"] = {
+            "columns": encoded_columns,
+            "memory_saved": sum(c["unencoded_bytes"] - c["encoded_bytes"] for c in encoded_columns.values())
+        }
+        
         return {
             "success": True,
             "analysis": analysis
@@ -590,6 +1170,112 @@ async def analyze_dataset(dataset_id: str):
             "error": str(e)
         }
 
+def record_usage(dataset: Dict):
+    """Count queries per dataset; the most used ones are preloaded after a restart"""
+    dataset["query_count"] = dataset.get("query_count", 0) + 1
+    dataset["last_used"] = datetime.now().isoformat()
+    catalog.mark_dirty()
+
+@app.on_event("startup")
+def rehydrate_catalog():
+    """
+    Restore the persisted catalog and query history at startup. Entries whose
+    files are gone are dropped, interrupted ingests are resumed and the most
+    used datasets are loaded into the cache in the background.
+    """
+    state = catalog.load()
+    # Partially received uploads from before the restart
+    for incoming_path in UPLOAD_DIR.glob(".incoming-*"):
+        incoming_path.unlink()
+
+    for dataset_id, dataset in state["datasets"].items():
+        if dataset.get("columnar_path") and not Path(dataset["columnar_path"]).exists():
+            # Reads fall back to the raw file
+            dataset["columnar_path"] = None
+        if not Path(dataset["file_path"]).exists() and not dataset.get("columnar_path"):
+            print(f"Dropping dataset {dataset_id} from catalog, its files are gone")
+            continue
+        datasets_storage[dataset_id] = dataset
+    queries_storage.extend(state["queries"])
+    startup_state["catalog_restored"] = True
+    if not datasets_storage or config_storage["preload_datasets"] <= 0:
+        startup_state["cache_warm"] = True
+    if not datasets_storage:
+        return
+
+    print(f"Restored {len(datasets_storage)} datasets from {catalog.path}")
+    resume_ingests()
+    if not startup_state["cache_warm"]:
+        threading.Thread(target=preload_datasets, args=(config_storage["preload_datasets"],),
+                         name="dataset-preload", daemon=True).start()
+
+def resume_ingests():
+    """Restart ingests that were interrupted by a restart, once per stored content"""
+    pending = {}
+    for dataset in datasets_storage.values():
+        if dataset.get("state") != "ingesting":
+            continue
+        if not Path(dataset["file_path"]).exists():
+            dataset["state"] = "failed"
+            dataset["error"] = "Uploaded file is missing"
+            continue
+        source = find_content(dataset["content_hash"], dataset["file_type"], dataset.get("sheet_index"))
+        if source is not None and source.get("state") == "ready":
+            adopt_content(dataset, source)
+        else:
+            # Sheets of a workbook share one file and one ingest
+            pending.setdefault(dataset["file_path"], []).append(dataset)
+
+    for file_path, datasets in pending.items():
+        primaries, duplicates = {}, []
+        for dataset in datasets:
+            if dataset.get("sheet_index") in primaries:
+                duplicates.append(dataset)
+            else:
+                primaries[dataset.get("sheet_index")] = dataset
+        entries = sorted(primaries.values(), key=lambda entry: entry.get("sheet_index") or 0)
+        total_bytes = Path(file_path).stat().st_size
+        if entries[0].get("sheet_index") is None:
+            job = ingest_jobs.submit(entries[0]["id"], total_bytes,
+                                     lambda job, dataset=entries[0]: ingest_dataset(dataset, columnar_path_for(dataset), job))
+        else:
+            job = ingest_jobs.submit(entries[0].get("parent_id") or entries[0]["id"], total_bytes,
+                                     lambda job, entries=entries: ingest_workbook(entries, job))
+        for duplicate in duplicates:
+            source = primaries[duplicate.get("sheet_index")]
+            ingest_jobs.submit(duplicate["id"], total_bytes, lambda job, duplicate=duplicate, source=source, source_job=job:
+                               adopt_when_ingested([duplicate], [source], source_job))
+    catalog.mark_dirty()
+
+def preload_datasets(limit: int):
+    """Warm the dataset cache with the most used datasets that fit its budget"""
+    try:
+        ranked = sorted(
+            (dataset for dataset in list(datasets_storage.values())
+             if dataset.get("state", "ready") == "ready" and dataset.get("query_count")),
+            key=lambda dataset: (dataset["query_count"], dataset.get("last_used", "")),
+            reverse=True
+        )
+        loaded, seen = 0, set()
+        for dataset in ranked:
+            if loaded >= limit:
+                break
+            if content_key(dataset) in seen:
+                continue
+            seen.add(content_key(dataset))
+            try:
+                if dataset_cache and not dataset_cache.fits(estimate_memory_bytes(dataset)):
+                    continue
+                load_dataset(dataset)
+                loaded += 1
+            except Exception as e:
+                print(f"Could not preload dataset {dataset['id']}: {e}")
+        if loaded:
+            print(f"Preloaded {loaded} datasets into the cache")
+    finally:
+        # A failed warm-up must not keep the worker out of rotation
+        startup_state["cache_warm"] = True
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
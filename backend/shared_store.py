@@ -0,0 +1,95 @@
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+class SharedDatasetStore:
+    """
+    Shared-memory dataset store for multi-process deployments of Sankalp DBMS.
+    Datasets are published once as uncompressed Arrow IPC files in a tmpfs
+    directory (e.g. /dev/shm/sankalp) and memory-mapped by every worker, so N
+    workers share one physical copy. Numeric columns without nulls are handed to
+    pandas without copying; other columns are converted per worker.
+    Deleting a dataset unlinks its file, and the kernel frees the pages once the
+    last worker drops its mapping.
+    """
+
+    def __init__(self, directory: Optional[str]):
+        self.directory = Path(directory) if directory and pa is not None else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.attached = 0
+        self.published = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def attach(self, dataset_id: str, version: Hashable) -> Optional[pd.DataFrame]:
+        """Memory-map a published dataset version, or None if it is not published"""
+        if not self.enabled:
+            return None
+        path = self._path(dataset_id, version)
+        try:
+            source = pa.memory_map(str(path), 'r')
+        except (FileNotFoundError, OSError):
+            return None
+        # The returned buffers keep the mapping alive after the reader goes away
+        table = pa.ipc.open_file(source).read_all()
+        self.attached += 1
+        return table.to_pandas(split_blocks=True)
+
+    def publish(self, dataset_id: str, version: Hashable, table: "pa.Table"):
+        """Write a dataset version into shared memory, replacing older versions"""
+        if not self.enabled:
+            return
+        path = self._path(dataset_id, version)
+        if path.exists():
+            return
+        self.remove(dataset_id)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        # Atomic rename so concurrent workers never map a partially written file
+        os.replace(tmp_path, path)
+        self.published += 1
+
+    def remove(self, dataset_id: str):
+        """Unlink every published version of a dataset"""
+        if not self.enabled:
+            return
+        for path in self.directory.glob(f"{dataset_id}@*.arrow"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        files = list(self.directory.glob("*.arrow"))
+        return {
+            "enabled": True,
+            "directory": str(self.directory),
+            "datasets": len(files),
+            "bytes": sum(path.stat().st_size for path in files if path.exists()),
+            "attached": self.attached,
+            "published": self.published
+        }
+
+    def _path(self, dataset_id: str, version: Hashable) -> Path:
+        token = "-".join(str(part) for part in version) if isinstance(version, tuple) else str(version)
+        return self.directory / f"{dataset_id}@{token}.arrow"
+
+
+# Disabled unless SHARED_DATASET_DIR points at a directory shared by all workers
+shared_store = SharedDatasetStore(os.getenv("SHARED_DATASET_DIR"))
@@ -0,0 +1,109 @@
+"""
+Startup benchmark for the Sankalp DBMS API server.
+
+Imports server.py in fresh interpreters under `python -X importtime`, records
+the import time of each module server.py pulls in and fails when the import
+exceeds its budget or loads a module that must only be imported on first use.
+
+    python startup_benchmark.py --runs 5 --budget-ms 1500 --output startup.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+# Heavy modules the server loads lazily; importing them at startup is a regression
+LAZY_MODULES = ('plotly', 'openpyxl')
+DEFAULT_BUDGET_MS = int(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+
+def measure_import():
+    """
+    One cold import of server.py. Returns ({module: {"self_ms", "cumulative_ms"}},
+    [modules imported directly by server.py]).
+    """
+    with tempfile.TemporaryDirectory() as upload_dir:
+        # An empty upload directory keeps catalog restore and preloading out of the measurement
+        env = dict(os.environ, UPLOAD_DIR=upload_dir, PRELOAD_DATASETS="0")
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import server'],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+        )
+    if process.returncode:
+        raise SystemExit(f"Importing server failed:\n{process.stderr}")
+
+    # -X importtime prints a module after everything it imported, indented two spaces per level
+    entries = [match.groups() for match in map(IMPORT_TIME_LINE.match, process.stderr.splitlines()) if match]
+    modules = {
+        name: {"self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000}
+        for self_us, cumulative_us, _, name in entries
+    }
+    server_index = next((i for i, entry in enumerate(entries) if entry[3] == "server"), None)
+    if server_index is None:
+        raise SystemExit("server was not imported")
+    direct = []
+    for _, _, indent, name in reversed(entries[:server_index]):
+        depth = len(indent) // 2
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append(name)
+    return modules, direct
+
+
+def run(runs: int) -> Dict[str, object]:
+    """Best of several runs per module, which filters out noise from a busy machine"""
+    best: Dict[str, Dict[str, float]] = {}
+    direct: List[str] = []
+    for _ in range(runs):
+        modules, direct = measure_import()
+        for name, timing in modules.items():
+            if name not in best or timing["cumulative_ms"] < best[name]["cumulative_ms"]:
+                best[name] = timing
+    return {
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "server_ms": best["server"]["cumulative_ms"],
+        "modules": {name: best[name]["cumulative_ms"] for name in direct},
+        "lazy_modules_loaded": sorted(name for name in best if name.split('.')[0] in LAZY_MODULES)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time of the API server")
+    parser.add_argument("--runs", type=int, default=5, help="cold imports to take the best of")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="fail above this import time")
+    parser.add_argument("--output", help="write the measurements as JSON to this file")
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    result["budget_ms"] = args.budget_ms
+
+    print(f"server imported in {result['server_ms']:.0f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    for name, cumulative_ms in sorted(result["modules"].items(), key=lambda item: -item[1]):
+        print(f"  {cumulative_ms:8.1f} ms  {name}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    failures = []
+    if result["server_ms"] > args.budget_ms:
+        failures.append(f"import took {result['server_ms']:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+    if result["lazy_modules_loaded"]:
+        failures.append(f"modules that must load lazily were imported: {', '.join(result['lazy_modules_loaded'])}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
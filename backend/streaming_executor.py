@@ -0,0 +1,171 @@
+import pandas as pd
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+from column_ops import predicates_mask, count_values
+from query_parser import Predicate, QueryPlan, describe_condition
+
+
+class StreamingExecutor:
+    """
+    Out-of-core execution for Sankalp DBMS queries.
+    Runs the count, filter and aggregation operators over a dataset one chunk at
+    a time, keeping only partial aggregates (sum/count/min/max per group) or the
+    matching rows in memory, and merges them into the same result shapes the
+    in-memory operators return.
+    """
+
+    STREAMABLE_OPERATIONS = (
+        'count', 'filter_greater', 'filter_less', 'filter_between', 'filter_equal', 'filter_contains',
+        'average', 'sum', 'max', 'min', 'count_by'
+    )
+
+    def execute(self, plan: QueryPlan, columns: List[str],
+                chunks: Callable[[Optional[List[str]]], Iterator[pd.DataFrame]]) -> Dict[str, Any]:
+        """
+        Execute one query plan. `columns` are the dataset's column names and
+        `chunks(projection)` yields DataFrames holding the projected columns.
+        """
+        operation = plan.operation
+        if operation == 'count':
+            return self._count_records(columns, chunks)
+        if operation.startswith('filter_'):
+            return self._filter(plan.predicates, columns, chunks)
+        if operation == 'count_by':
+            return self._count_by_group(plan.column, columns, chunks)
+        return self._aggregate(operation, plan.column, plan.group_key, columns, chunks)
+
+    def _count_records(self, columns, chunks) -> Dict[str, Any]:
+        total = sum(len(chunk) for chunk in chunks(columns[:1]))
+        return {
+            "type": "metric",
+            "value": total,
+            "label": "Total Records",
+            "message": f"Dataset contains {total} records"
+        }
+
+    def _filter(self, predicates: Tuple[Predicate, ...], columns, chunks) -> Dict[str, Any]:
+        for predicate in predicates:
+            if predicate.column not in columns:
+                return {"type": "error", "message": f"Column '{predicate.column}' not found"}
+
+        try:
+            matched = []
+            for chunk in chunks(None):
+                mask = predicates_mask(chunk, predicates)
+                if mask.any():
+                    matched.append(chunk[mask])
+            filtered_df = pd.concat(matched, ignore_index=True) if matched else pd.DataFrame(columns=columns)
+        except Exception as e:
+            return {"type": "error", "message": f"Error filtering data: {str(e)}"}
+
+        condition = describe_condition(predicates)
+        return {
+            "type": "table",
+            "data": filtered_df.to_dict('records'),
+            "columns": columns,
+            "total_rows": len(filtered_df),
+            "message": f"Found {len(filtered_df)} records where {condition}"
+        }
+
+    def _count_by_group(self, column, columns, chunks) -> Dict[str, Any]:
+        if column not in columns:
+            return {"type": "error", "message": f"Column '{column}' not found"}
+
+        try:
+            counts = None
+            for chunk in chunks([column]):
+                chunk_counts = count_values(chunk[column])
+                # Chunks may carry different dictionaries, align on the values themselves
+                chunk_counts.index = chunk_counts.index.astype(object)
+                counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+            result = {} if counts is None else counts.astype(int).sort_values(ascending=False).to_dict()
+            return {
+                "type": "grouped_metric",
+                "data": result,
+                "operation": "count",
+                "column": column,
+                "message": f"Count by {column}"
+            }
+        except Exception as e:
+            return {"type": "error", "message": f"Error counting by group: {str(e)}"}
+
+    def _aggregate(self, operation, column, group_by, columns, chunks) -> Dict[str, Any]:
+        # (result operation, metric label, grouped title, error action) as in SankalpQueryEngine
+        labels = {
+            'average': ("average", "Average", "Average", "calculating average"),
+            'sum': ("sum", "Total", "Sum", "calculating sum"),
+            'max': ("maximum", "Maximum", "Maximum", "finding maximum"),
+            'min': ("minimum", "Minimum", "Minimum", "finding minimum")
+        }
+        operation_name, label, title, action = labels[operation]
+
+        if column not in columns:
+            return {"type": "error", "message": f"Column '{column}' not found"}
+        if group_by and group_by not in columns:
+            return {"type": "error", "message": f"Group by column '{group_by}' not found"}
+
+        try:
+            if group_by:
+                result = self._grouped_partials(operation, column, group_by, chunks)
+                return {
+                    "type": "grouped_metric",
+                    "data": result,
+                    "operation": operation_name,
+                    "column": column,
+                    "group_by": group_by,
+                    "message": f"{title} {column} by {group_by}"
+                }
+
+            value = self._scalar_partials(operation, column, chunks)
+            message_value = f"{value:.2f}" if operation == 'average' else f"{value}"
+            return {
+                "type": "metric",
+                "value": value,
+                "label": f"{label} {column}",
+                "message": f"{label} {column}: {message_value}"
+            }
+        except Exception as e:
+            return {"type": "error", "message": f"Error {action}: {str(e)}"}
+
+    def _scalar_partials(self, operation, column, chunks):
+        total, count, minimum, maximum = 0, 0, None, None
+        for chunk in chunks([column]):
+            series = chunk[column]
+            if operation in ('average', 'sum'):
+                total += series.sum()
+                count += series.count()
+            else:
+                values = series.dropna()
+                if values.empty:
+                    continue
+                chunk_min, chunk_max = values.min(), values.max()
+                minimum = chunk_min if minimum is None else min(minimum, chunk_min)
+                maximum = chunk_max if maximum is None else max(maximum, chunk_max)
+
+        if operation == 'average':
+            return total / count if count else float('nan')
+        if operation == 'sum':
+            return total
+        value = maximum if operation == 'max' else minimum
+        return float('nan') if value is None else value
+
+    def _grouped_partials(self, operation, column, group_by, chunks) -> Dict[Any, Any]:
+        partial_aggs = {'average': ['sum', 'count'], 'sum': ['sum'], 'max': ['max'], 'min': ['min']}[operation]
+        partials = []
+        projection = list(dict.fromkeys([column, group_by]))
+        for chunk in chunks(projection):
+            partial = chunk.groupby(group_by, observed=True)[column].agg(partial_aggs)
+            partial.index = partial.index.astype(object)
+            partials.append(partial)
+
+        if not partials:
+            return {}
+        combined = pd.concat(partials).groupby(level=0)
+        if operation == 'average':
+            merged = combined.sum()
+            return (merged['sum'] / merged['count']).to_dict()
+        if operation == 'sum':
+            return combined['sum'].sum().to_dict()
+        if operation == 'max':
+            return combined['max'].max().to_dict()
+        return combined['min'].min().to_dict()
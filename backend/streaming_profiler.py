@@ -0,0 +1,209 @@
+import io
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from file_utils import (
+    apply_schema, compact_string_dtype, ISO_DATE_PATTERN, DICTIONARY_MAX_CARDINALITY, DICTIONARY_MAX_RATIO
+)
+
+SAMPLE_ROWS = 5
+INTEGER_DTYPES = ('int8', 'int16', 'int32', 'int64')
+
+
+class ColumnProfile:
+    """Running statistics of one column across all batches seen so far"""
+
+    def __init__(self):
+        self.kind: Optional[str] = None
+        self.nulls = 0
+        self.minimum = None
+        self.maximum = None
+        self.total = 0
+        self.distinct = set()
+        self.distinct_overflow = False
+        self.all_iso_dates = True
+
+    def update(self, series: pd.Series):
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        if values.empty:
+            return
+
+        kind = _batch_kind(series, values)
+        self.kind = _merge_kinds(self.kind, kind)
+
+        if kind in ('int', 'float'):
+            batch_min, batch_max = values.min(), values.max()
+            self.minimum = batch_min if self.minimum is None else min(self.minimum, batch_min)
+            self.maximum = batch_max if self.maximum is None else max(self.maximum, batch_max)
+            self.total += values.sum().item()
+
+        if kind != 'string' or not values.str.match(ISO_DATE_PATTERN).all():
+            self.all_iso_dates = False
+
+        if not self.distinct_overflow:
+            self.distinct.update(str(value) for value in values.unique())
+            if len(self.distinct) > DICTIONARY_MAX_CARDINALITY:
+                self.distinct_overflow = True
+                self.distinct = set()
+
+    def dtype(self, rows: int) -> str:
+        """Dtype name this column would get from infer_schema on the full file"""
+        if self.kind is None:
+            # Entirely empty columns parse as float NaN
+            return 'float64'
+        if self.kind == 'int' and self.nulls:
+            # Missing values turn integer columns into floats
+            return 'float64'
+        if self.kind == 'bool' and self.nulls:
+            return 'object'
+        if self.kind == 'int':
+            for name in INTEGER_DTYPES:
+                info = np.iinfo(name)
+                if info.min <= self.minimum and self.maximum <= info.max:
+                    return name
+        if self.kind in ('float', 'bool', 'object'):
+            return {'float': 'float64', 'bool': 'bool', 'object': 'object'}[self.kind]
+        if self.all_iso_dates:
+            return 'datetime64[ns]'
+        distinct = len(self.distinct)
+        if not self.distinct_overflow and distinct <= DICTIONARY_MAX_CARDINALITY and distinct <= rows * DICTIONARY_MAX_RATIO:
+            return 'category'
+        return str(compact_string_dtype())
+
+
+class StreamingProfiler:
+    """
+    Single-pass CSV profiler for uploads.
+    Fed the raw bytes as they arrive, it parses each run of complete records
+    once and keeps row count, per-column null counts, type inference,
+    min/max/sum and the first sample rows, so the dataset metadata is ready as
+    soon as the last byte has been written.
+    """
+
+    def __init__(self):
+        self._header: Optional[bytes] = None
+        self._buffer = b''
+        self._columns: List[str] = []
+        self._profiles: Dict[str, ColumnProfile] = {}
+        self._sample: Optional[pd.DataFrame] = None
+        self.rows = 0
+        self.bytes_seen = 0
+
+    def feed(self, data: bytes):
+        """Consume the next block of the upload"""
+        self.bytes_seen += len(data)
+        self._buffer += data
+        if self._header is None:
+            header_end = _first_record_end(self._buffer)
+            if header_end < 0:
+                return
+            self._header = self._buffer[:header_end + 1]
+            self._buffer = self._buffer[header_end + 1:]
+        records, self._buffer = _split_complete_records(self._buffer)
+        if records:
+            self._parse(records)
+
+    def finish(self, file_size: int) -> Dict[str, Any]:
+        """Flush the trailing record and return the upload metadata"""
+        if self._header is None:
+            self._header, self._buffer = self._buffer, b''
+            if not self._header.endswith(b'\n'):
+                self._header += b'\n'
+        if self._buffer.strip():
+            self._parse(self._buffer)
+            self._buffer = b''
+        if not self._columns:
+            self._columns = [str(col) for col in pd.read_csv(io.BytesIO(self._header)).columns]
+            self._profiles = {col: ColumnProfile() for col in self._columns}
+
+        column_types = {col: self._profiles[col].dtype(self.rows) for col in self._columns}
+        sample = self._sample.head(SAMPLE_ROWS) if self._sample is not None else pd.DataFrame(columns=self._columns)
+        numeric = [col for col in self._columns if self._profiles[col].kind in ('int', 'float')]
+        return {
+            "rows": self.rows,
+            "columns": len(self._columns),
+            "column_names": list(self._columns),
+            "column_types": column_types,
+            "sample": apply_schema(sample, column_types),
+            "missing_values": {col: int(self._profiles[col].nulls) for col in self._columns},
+            "file_size": int(file_size),
+            "numeric_columns": numeric,
+            "categorical_columns": [col for col, dtype in column_types.items()
+                                    if dtype in ('object', 'category') or dtype == str(compact_string_dtype())],
+            "date_columns": [col for col, dtype in column_types.items() if dtype.startswith('datetime64')],
+            "column_stats": {
+                col: {
+                    "min": _native(self._profiles[col].minimum),
+                    "max": _native(self._profiles[col].maximum),
+                    "sum": _native(self._profiles[col].total)
+                }
+                for col in numeric
+            }
+        }
+
+    def _parse(self, records: bytes):
+        batch = pd.read_csv(io.BytesIO(self._header + records))
+        if not self._columns:
+            self._columns = [str(col) for col in batch.columns]
+            self._profiles = {col: ColumnProfile() for col in self._columns}
+        elif [str(col) for col in batch.columns] != self._columns:
+            raise ValueError("Inconsistent columns between CSV batches")
+
+        for col in batch.columns:
+            self._profiles[str(col)].update(batch[col])
+        self.rows += len(batch)
+        if self._sample is None or len(self._sample) < SAMPLE_ROWS:
+            head = batch.head(SAMPLE_ROWS)
+            self._sample = head if self._sample is None else pd.concat([self._sample, head], ignore_index=True)
+
+
+def _batch_kind(series: pd.Series, values: pd.Series) -> str:
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'int'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'float'
+    if values.map(type).eq(str).all():
+        return 'string'
+    return 'object'
+
+
+def _merge_kinds(current: Optional[str], new: str) -> str:
+    """Combine the kinds of two batches the way a whole-file parse would"""
+    if current is None or current == new:
+        return new
+    if {current, new} == {'int', 'float'}:
+        return 'float'
+    if 'object' in (current, new) or 'bool' in (current, new):
+        return 'object'
+    # Text mixed with numbers parses as text
+    return 'string'
+
+
+def _first_record_end(buffer: bytes) -> int:
+    """Index of the newline ending the first record, skipping quoted newlines"""
+    pos = buffer.find(b'\n')
+    while pos >= 0 and buffer.count(b'"', 0, pos) % 2:
+        pos = buffer.find(b'\n', pos + 1)
+    return pos
+
+
+def _split_complete_records(buffer: bytes):
+    """Split a buffer that starts on a record boundary into complete records and the remainder"""
+    end = len(buffer)
+    while True:
+        pos = buffer.rfind(b'\n', 0, end)
+        if pos < 0:
+            return b'', buffer
+        if buffer.count(b'"', 0, pos) % 2 == 0:
+            return buffer[:pos + 1], buffer[pos + 1:]
+        end = pos
+
+
+def _native(value):
+    return value.item() if isinstance(value, np.generic) else value
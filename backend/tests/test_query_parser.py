@@ -0,0 +1,140 @@
+import pytest
+
+from query_parser import QueryParser, QueryPlan, Predicate, PlanCache, normalize_query, parameterize
+
+
+@pytest.fixture
+def parser():
+    return QueryParser()
+
+
+def parse(parser, query):
+    return parser.parse(normalize_query(query))
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("show all data", QueryPlan('show_all')),
+    ("display records", QueryPlan('show_all')),
+    ("select all", QueryPlan('show_all')),
+    ("show first 10", QueryPlan('show_first', limit=10)),
+    ("show top 3", QueryPlan('show_first', limit=3)),
+    ("show last 5", QueryPlan('show_last', limit=5)),
+    ("count records", QueryPlan('count')),
+    ("how many rows", QueryPlan('count')),
+    ("count records by city", QueryPlan('count_by', columns=('city',))),
+    ("count city by category", QueryPlan('count_by', columns=('city',))),
+    ("group by city and count", QueryPlan('count_by', columns=('city',))),
+    ("what are the columns", QueryPlan('columns')),
+    ("show columns", QueryPlan('columns')),
+    ("describe the data", QueryPlan('describe')),
+    ("summary of data", QueryPlan('describe')),
+    ("average of price", QueryPlan('average', columns=('price',))),
+    ("calculate sum of sales by region", QueryPlan('sum', columns=('sales',), group_by=('region',))),
+    ("max age", QueryPlan('max', columns=('age',))),
+    ("sort by price descending", QueryPlan('sort', columns=('price',), descending=True)),
+    ("order by name", QueryPlan('sort', columns=('name',))),
+    ("create bar chart of sales by region", QueryPlan('bar_chart', columns=('sales', 'region'))),
+    ("line graph of price", QueryPlan('line_chart', columns=('price',))),
+    ("pie chart of city", QueryPlan('pie_chart', columns=('city',))),
+    ("scatter plot of age vs income", QueryPlan('scatter_plot', columns=('age', 'income'))),
+])
+def test_query_forms(parser, query, expected):
+    assert parse(parser, query) == expected
+
+
+@pytest.mark.parametrize("query, op, value", [
+    ("where age greater than 25", '>', 25.0),
+    ("where age is > 25.5", '>', 25.5),
+    ("filter price less than 100", '<', 100.0),
+    ("where temp greater than -5", '>', -5.0),
+    ("where temp < -0.5", '<', -0.5),
+    ("where temp > +3", '>', 3.0),
+    ("where city equals Pune", '=', 'pune'),
+    ("where city is equal to 'New Delhi'", '=', 'new delhi'),
+    ("where code = -5", '=', '-5'),
+    ("where name contains ram", 'contains', 'ram'),
+])
+def test_filters(parser, query, op, value):
+    column = query.split()[1]
+    plan = parse(parser, query)
+    assert plan.column == column
+    assert plan.predicates == (Predicate(column, op, value),)
+
+
+def test_dotted_column(parser):
+    plan = parse(parser, "where address.zip greater than 400000")
+    assert plan.predicates == (Predicate('address.zip', '>', 400000.0),)
+
+
+@pytest.mark.parametrize("query, low, high", [
+    ("where x between 10 and 100", 10.0, 100.0),
+    ("where x is between -10 and 5", -10.0, 5.0),
+    ("where x between -10 and -20", -20.0, -10.0),
+    ("where x between 100 and 10", 10.0, 100.0),
+])
+def test_between(parser, query, low, high):
+    plan = parse(parser, query)
+    assert plan.operation == 'filter_between'
+    assert plan.predicates == (Predicate('x', '>=', low), Predicate('x', '<=', high))
+
+
+@pytest.mark.parametrize("query", [
+    "where temp greater than - 5",
+    "where x between - 10 and 5",
+    "show first -5",
+    "where age greater than",
+    "hello world",
+    "",
+])
+def test_not_understood(parser, query):
+    assert parse(parser, query) is None
+
+
+def test_most_specific_rule_wins(parser):
+    # 'count records' is a prefix of the grouped count
+    assert parse(parser, "count records by city").operation == 'count_by'
+
+
+def test_parameterize_keeps_signs():
+    assert parameterize("where temp > -4") == ("where temp > \0", ('-4',))
+    assert parameterize("where x between 1.5 and 'a b'") == ("where x between \0 and \0", ('1.5', 'a b'))
+
+
+def test_plan_cache_rebinds_parameters(parser):
+    cache = PlanCache(16)
+    cache.get_or_parse("where temp > 4", parser.parse)
+    plan = cache.get_or_parse("where temp > -4", parser.parse)
+    assert plan.predicates == (Predicate('temp', '>', -4.0),)
+    assert cache.stats()["hits"] == 1
+
+
+def test_plan_cache_orders_between_bounds(parser):
+    cache = PlanCache(16)
+    cache.get_or_parse("where x between 9 and -2", parser.parse)
+    plan = cache.get_or_parse("where x between 2 and 8", parser.parse)
+    assert plan.predicates == (Predicate('x', '>=', 2.0), Predicate('x', '<=', 8.0))
+    plan = cache.get_or_parse("where x between 8 and 2", parser.parse)
+    assert plan.predicates == (Predicate('x', '>=', 2.0), Predicate('x', '<=', 8.0))
+    assert cache.stats()["hits"] == 2
+
+
+def test_plan_cache_matches_parser(parser):
+    cache = PlanCache(16)
+    for query in ("show first 3", "show first 7", "where city equals 'pune'", "where city equals 'goa'",
+                  "where price between 5 and 50", "where price between 50 and 5"):
+        assert cache.get_or_parse(query, parser.parse) == parser.parse(query)
+
+
+@pytest.mark.parametrize("cached, query", [
+    ("show first 2", "show first -1"),
+    ("show last 3", "show last '-4'"),
+    ("where age greater than 30", 'where age greater than "abc"'),
+    ("where age < 5", "where age < 'x'"),
+    ("where x between 1 and 5", 'where x between "a" and 5'),
+    ("where x between 1 and 5", "where x between 1 and 'b'"),
+])
+def test_plan_cache_rejects_what_parser_rejects(parser, cached, query):
+    cache = PlanCache(16)
+    cache.get_or_parse(cached, parser.parse)
+    assert cache.get_or_parse(query, parser.parse) == parser.parse(query)
+    assert cache.stats()["hits"] == 0
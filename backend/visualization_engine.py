@@ -1,9 +1,18 @@
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from typing import Dict, Any
 import json
 
+from file_utils import load_dataset
+
+# plotly.express is the slowest import of the API server, it is loaded with the first chart
+px = None
+
+def _load_plotly():
+    global px
+    if px is None:
+        import plotly.express
+        px = plotly.express
+
 class VisualizationEngine:
     """
     Visualization Engine for Sankalp DBMS
@@ -16,6 +25,8 @@ class VisualizationEngine:
     async def create_visualization(self, dataset: Dict, chart_type: str, config: Dict) -> Dict[str, Any]:
         """Create visualization from dataset"""
         try:
+            _load_plotly()
+
             # Load the dataset
             df = self._load_dataset(dataset)
 
@@ -45,18 +56,8 @@ class VisualizationEngine:
             }
 
     def _load_dataset(self, dataset: Dict) -> pd.DataFrame:
-        """Load dataset from file path"""
-        file_path = dataset["file_path"]
-        file_type = dataset["file_type"]
-
-        if file_type == 'csv':
-            return pd.read_csv(file_path)
-        elif file_type == 'json':
-            return pd.read_json(file_path)
-        elif file_type in ['xlsx', 'xls']:
-            return pd.read_excel(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
+        """Load dataset through the shared dataset cache"""
+        return load_dataset(dataset)
 
     def _create_bar_chart(self, df: pd.DataFrame, config: Dict) -> Dict[str, Any]:
         """Create bar chart"""
@@ -94,6 +94,8 @@ const DataManager = ({
       case 'xls':
         return <FileText className="h-5 w-5 text-green-600" />;
       case 'json':
+      case 'jsonl':
+      case 'ndjson':
         return <Database className="h-5 w-5 text-blue-600" />;
       default:
         return <FileText className="h-5 w-5 text-gray-600" />;
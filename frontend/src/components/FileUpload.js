@@ -14,6 +14,8 @@ import {
 import { apiService } from '../services/api';
 import toast from 'react-hot-toast';
 
+const COMPRESSION_SUFFIXES = ['gz', 'zst'];
+
 const FileUpload = ({ onUpload, config }) => {
   const [uploading, setUploading] = useState(false);
   const [uploadProgress, setUploadProgress] = useState(0);
@@ -21,14 +23,16 @@ const FileUpload = ({ onUpload, config }) => {
   const [previewData, setPreviewData] = useState(null);
   const [showPreview, setShowPreview] = useState(false);
 
-  const allowedTypes = config?.allowed_file_types || ['csv', 'json', 'xlsx', 'xls'];
+  const allowedTypes = config?.allowed_file_types || ['csv', 'json', 'jsonl', 'ndjson', 'xlsx', 'xls'];
 
   const onDrop = useCallback(async (acceptedFiles) => {
     const file = acceptedFiles[0];
     if (!file) return;
 
-    // Check file type
-    const fileExt = file.name.split('.').pop().toLowerCase();
+    // Check file type, looking through a .gz/.zst compression suffix
+    const nameParts = file.name.toLowerCase().split('.');
+    const compressed = nameParts.length > 2 && COMPRESSION_SUFFIXES.includes(nameParts[nameParts.length - 1]);
+    const fileExt = compressed ? nameParts[nameParts.length - 2] : nameParts[nameParts.length - 1];
     if (!allowedTypes.includes(fileExt)) {
       toast.error(`File type .${fileExt} not supported. Allowed types: ${allowedTypes.join(', ')}`);
       return;
@@ -65,8 +69,11 @@ const FileUpload = ({ onUpload, config }) => {
     accept: {
       'text/csv': ['.csv'],
       'application/json': ['.json'],
+      'application/x-ndjson': ['.jsonl', '.ndjson'],
       'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': ['.xlsx'],
-      'application/vnd.ms-excel': ['.xls']
+      'application/vnd.ms-excel': ['.xls'],
+      'application/gzip': ['.gz'],
+      'application/zstd': ['.zst']
     },
     maxFiles: 1,
     disabled: uploading
@@ -77,6 +84,8 @@ const FileUpload = ({ onUpload, config }) => {
       case 'csv':
         return <FileText className="h-8 w-8 text-green-600" />;
       case 'json':
+      case 'jsonl':
+      case 'ndjson':
         return <File className="h-8 w-8 text-blue-600" />;
       case 'xlsx':
       case 'xls':
@@ -84,6 +84,11 @@ class ApiService {
       });
 
       console.log('Upload response:', response.data);
+
+      // Parsing runs in the background; wait until the dataset is ready
+      if (response.data.state && response.data.state !== 'ready') {
+        return await this.waitForDataset(response.data.id);
+      }
       return response.data;
     } catch (error) {
       console.error('API Error:', error.response?.data || error.message);
@@ -118,6 +123,29 @@ class ApiService {
     }
   }
 
+  async getDatasetStatus(datasetId) {
+    try {
+      const response = await this.client.get(`/api/datasets/${datasetId}/status`);
+      return response.data;
+    } catch (error) {
+      throw new Error('Failed to get dataset status');
+    }
+  }
+
+  async waitForDataset(datasetId, pollInterval = 500) {
+    for (;;) {
+      const { status } = await this.getDatasetStatus(datasetId);
+      if (status.state === 'ready') {
+        const { dataset } = await this.getDataset(datasetId);
+        return dataset;
+      }
+      if (status.state === 'failed') {
+        throw new Error(status.error || 'Failed to process file');
+      }
+      await new Promise((resolve) => setTimeout(resolve, pollInterval));
+    }
+  }
+
   async deleteDataset(datasetId) {
     try {
       const response = await this.client.delete(`/api/datasets/${datasetId}`);